@@ -8,8 +8,13 @@ from .mami_lang import EN, GER, FRA
 from .mami_init import Init
 from .mami_file import File
 from .mami_setup import Setup
+from .mami_kernel import Kernel
+from .mami_cache import LruCache
+from .mami_space import VariantSpace
 from .mami_calc import Calculation
 from .mami_starter import Starter
+from .mami_batch import Batch
+from .mami_bench import Bench
 from .mami_tools import ColorList
 from .mami_tools import ToolBox
 from .mami_tools import ProgressBar
@@ -0,0 +1,162 @@
+""" Batch Mode
+    statistic runs without prompts, machine-readable results
+"""
+import sys
+import csv
+import json
+import argparse
+from pathlib import Path
+from contextlib import redirect_stdout
+
+from .mami_starter import Starter
+
+
+class Batch(Starter):
+    """
+    run
+    parse_args
+    apply_args
+    write_results
+    """
+
+    FORMATS = ("json", "csv")
+
+    @classmethod
+    def run(cls, argv=None):
+        """ batch main call: arguments -> statistic run -> results
+            the human-readable output goes to stderr
+            returns the exit code
+        """
+        args = cls.parse_args(argv)
+        cls.apply_args(args)
+
+        if args.compact_trees:
+            print(f'compacted tree files: {cls.compact_tree_files()}', file=sys.stderr)
+            return 0
+
+        with redirect_stdout(sys.stderr):
+            cls.show_setup()
+            cls.load_tor_file()
+            results = cls.start_statistic(args.algo)
+            cls.save_tree_files()
+
+        cls.write_results(results, args.format, args.output)
+        return 0
+
+
+    @classmethod
+    def parse_args(cls, argv=None):
+        """ command line arguments, the defaults are the Init values
+        """
+        algos = ", ".join(f'{key}:{name}' for key, name in cls.ALGO_SET.items())
+        parser = argparse.ArgumentParser(
+            prog="mami.py",
+            description="MasterMind statistic run without prompts")
+
+        parser.add_argument("--char", type=int, default=cls.char,
+                            help="number of characters")
+        parser.add_argument("--columns", type=int, default=cls.columns,
+                            help="number of columns")
+        parser.add_argument("--repetition", action=argparse.BooleanOptionalAction,
+                            default=cls.repetition, help="repetition of a character")
+        parser.add_argument("--letters", action="store_true",
+                            help="letters instead of digits as characters")
+        parser.add_argument("--limit", type=int, default=cls.limit,
+                            help="max. guesses per game")
+        parser.add_argument("--algo", type=int, nargs="+", choices=sorted(cls.ALGO_SET),
+                            help=f'solver algorithms ({algos}), default: all')
+        parser.add_argument("--runs", type=int, default=cls.stat_runs,
+                            help="random secrets per algorithm")
+        parser.add_argument("--exact", action="store_true",
+                            help="every secret once instead of random runs")
+        parser.add_argument("--seed", type=int, default=cls.seed,
+                            help="random seed, reproducible secrets and guesses")
+        parser.add_argument("--workers", type=int, default=cls.workers,
+                            help="worker processes")
+        parser.add_argument("--sample-budget", type=int, default=cls.sample_budget,
+                            help="candidate x pool evaluations per turn, 0: exact solvers")
+        parser.add_argument("--population", type=int, default=cls.ga_population,
+                            help="codes per generation of the genetic solver")
+        parser.add_argument("--generations", type=int, default=cls.ga_generations,
+                            help="max. generations per turn of the genetic solver")
+        parser.add_argument("--cache-mb", type=int, default=cls.cache_size,
+                            help="memory budget of the response cache, MB")
+        parser.add_argument("--profile", action="store_true",
+                            help="per-phase and per-turn timers")
+        parser.add_argument("--tor", type=Path, metavar="DIR",
+                            help=f'directory of the TOR files, default: {cls.TOR_DIR}')
+        parser.add_argument("--no-tor", action="store_true",
+                            help="without TOR file")
+        parser.add_argument("--store", action="store_true",
+                            help=f'append the results to {cls.STAT_FILE}.log and .{cls.stat_format}')
+        parser.add_argument("--tree-store", action="store_true",
+                            help="load and save the decision trees of the solvers")
+        parser.add_argument("--no-book", action="store_true",
+                            help="without the stored opening book of the first two turns")
+        parser.add_argument("--compact-trees", action="store_true",
+                            help="only compact the delta logs of the stored decision trees")
+        parser.add_argument("--format", choices=cls.FORMATS, default="json",
+                            help="output format")
+        parser.add_argument("--output", type=Path, metavar="FILE",
+                            help="output file, default: stdout")
+
+        return parser.parse_args(argv)
+
+
+    @classmethod
+    def apply_args(cls, args):
+        """ takes over the arguments as user setup
+        """
+        cls.char       = args.char
+        cls.columns    = args.columns
+        cls.repetition = args.repetition
+        cls.numbers    = not args.letters
+        cls.limit      = args.limit
+        cls.stat_runs  = max(1, min(args.runs, cls.MAX_RUN1))
+        cls.stat_exact = args.exact
+        cls.seed       = args.seed
+        cls.workers    = args.workers
+        cls.sample_budget = args.sample_budget
+        cls.ga_population = args.population
+        cls.ga_generations = args.generations
+        cls.cache_size = args.cache_mb
+        cls.tor_help   = not args.no_tor
+        cls.profile    = args.profile
+        cls.stat_store = args.store
+        cls.tree_store = args.tree_store
+        cls.opening_book = not args.no_book
+        if args.tor:
+            args.tor.mkdir(parents=True, exist_ok=True)
+            cls.TOR_DIR = args.tor.resolve()
+
+        cls.statistic  = True
+        cls.autocoder  = True
+        cls.autosolver = True
+        cls.algo_all   = not args.algo
+        # the smallest: a solver with variant pool limits the setup
+        cls.algo       = min(args.algo) if args.algo else cls.algo
+
+        cls.check_setup()
+        cls.len_variants()
+
+
+    @classmethod
+    def write_results(cls, results, fmt="json", output=None):
+        """ results as a json list or csv rows, to file or stdout
+        """
+        file = open(output, "w", newline="", encoding="utf-8") if output else sys.stdout
+        try:
+            if fmt == "csv":
+                writer = csv.DictWriter(file, fieldnames=list(results[0]))
+                writer.writeheader()
+                for result in results:
+                    writer.writerow(cls.flat_record(result))
+            else:
+                json.dump(results, file, indent=2)
+                file.write("\n")
+        finally:
+            if output:
+                file.close()
+
+
+# ==========================================================
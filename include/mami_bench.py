@@ -0,0 +1,206 @@
+""" Benchmark Suite
+    hot paths of the solvers, ops/sec and memory against a saved baseline
+"""
+import io
+import json
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from .mami_starter import Starter
+
+
+class Bench(Starter):
+    """
+    run
+    parse_args
+    bench_cases
+    use_setup
+    second_turn
+    measure
+    show_results
+    """
+
+    SEED   = 20_250_101  # every case starts with the same random state
+    PAIRS  = 20_000      # guess/code pairs of the feedback cases
+    FILTER = 200         # secrets of the filter case
+
+    # (char, columns, repetition) of the solver turn cases
+    SETUPS = ((6, 4, True), (6, 4, False), (8, 5, True), (8, 5, False))
+    QUICK  = ((6, 4, True), (6, 4, False))
+
+    @classmethod
+    def run(cls, argv=None):
+        """ bench main call: runs all cases, compares with the baseline
+            returns the exit code
+        """
+        args = cls.parse_args(argv)
+        filename = args.baseline or Path(cls.MY_PATH, cls.BENCH_FILE + ".json")
+
+        baseline = {}
+        if Path(filename).is_file():
+            with open(filename, encoding="utf-8") as file:
+                baseline = json.load(file)
+
+        results = {}
+        for name, ops, func in cls.bench_cases(args.quick):
+            results[name] = cls.measure(func, ops, args.repeat)
+            cls.show_results(name, results[name], baseline.get(name))
+
+        if args.save:
+            with open(filename, "w", encoding="utf-8") as file:
+                json.dump(results, file, indent=2)
+            print(f'\nbaseline saved: {filename}')
+
+        return 0
+
+
+    @classmethod
+    def parse_args(cls, argv=None):
+        """ command line arguments of the benchmark
+        """
+        parser = argparse.ArgumentParser(
+            prog="mami.py --bench",
+            description="MasterMind benchmark of the solver hot paths")
+
+        parser.add_argument("--quick", action="store_true",
+                            help="without the large setups")
+        parser.add_argument("--repeat", type=int, default=5,
+                            help="runs per case, the best one counts")
+        parser.add_argument("--baseline", type=Path, metavar="FILE",
+                            help=f'baseline file, default: {cls.BENCH_FILE}.json')
+        parser.add_argument("--save", action="store_true",
+                            help="save the results as new baseline")
+
+        return parser.parse_args(argv)
+
+
+    @classmethod
+    def bench_cases(cls, quick=False):
+        """ yields (name, ops, func) per case,
+            the setup of a case is done before, not measured
+        """
+        # single feedbacks, w/o cache
+        cls.use_setup(6, 4, True)
+        allvariants = cls.allvariants
+        pairs = [(allvariants[random.randrange(len(allvariants))],
+                  allvariants[random.randrange(len(allvariants))]) for _ in range(cls.PAIRS)]
+        for name, method in (("feedback_0", cls.feedback_0), ("feedback_1", cls.feedback_1)):
+            yield f'{name} 6/4', len(pairs), lambda method=method: [method(*pair) for pair in pairs]
+
+        # pool filtering after the first guess
+        cls.use_setup(6, 4, True)
+        guess = cls.first_pattern(0)
+        secrets = [cls.gen_variant() for _ in range(cls.FILTER)]
+        answers = [cls.feedback_0(guess, secret) for secret in secrets]
+        variants = np.ones(len(cls.allvariants), dtype=bool)
+        yield "filter 6/4", len(answers), lambda: [
+            cls.filter_variants(guess, answer, variants) for answer in answers]
+
+        # one solver turn, the second one
+        modes = ((2, cls.knuth_mode), (3, cls.kooi_mode), (4, cls.irvi_mode),
+                 (5, cls.entropy_mode))
+        for char, columns, repetition in (cls.QUICK if quick else cls.SETUPS):
+            for algo, mode in modes:
+                cls.use_setup(char, columns, repetition)
+                variants = cls.second_turn(algo)
+                rep = "r" if repetition else "u"
+                yield (f'{cls.ALGO_SET[algo].lower()} {char}/{columns}{rep}', 1,
+                       lambda mode=mode, variants=variants: mode(variants, cls.allvariants))
+
+        # TOR generation and a full read, in a temporary directory
+        with tempfile.TemporaryDirectory() as temp:
+            cls.use_setup(6, 4, True)
+            cls.TOR_DIR, tor_dir = temp, cls.TOR_DIR
+            size = cls.len_variants() ** 2
+            try:
+                yield "tor save 6/4", size, cls.save_tor_file
+
+                def load():
+                    cls.tor_help, cls.tor_loaded = True, False
+                    with redirect_stdout(io.StringIO()):
+                        cls.load_tor_file()
+                    return int(cls.tor_imp.sum())
+
+                yield "tor load 6/4", size, load
+            finally:
+                cls.TOR_DIR = tor_dir
+                cls.use_setup(6, 4, True)
+
+
+    @classmethod
+    def use_setup(cls, char, columns, repetition):
+        """ a solver setup without TOR, cache and previous guesses,
+            with the fixed random state
+        """
+        cls.char, cls.columns, cls.repetition = char, columns, repetition
+        cls.numbers    = True
+        cls.statistic  = True
+        cls.autosolver = True
+        cls.tor_help   = False
+        cls.fb_alternat = False
+        cls.sample_budget = 0
+
+        cls.check_setup()
+        cls.len_variants()
+        cls.load_tor_file()         # detaches a loaded TOR
+        cls.gen_allvariants()
+        cls.cache.clear()
+        cls.prev_guesses = []
+        cls.prev_answers = []
+        random.seed(cls.SEED)
+
+
+    @classmethod
+    def second_turn(cls, algo):
+        """ pool mask after the first guess of 'algo' for a random secret
+        """
+        cls.algo = algo
+        secret = cls.gen_variant()
+        guess = cls.first_pattern(0 if algo == 2 else 1)
+        cls.prev_guesses = [guess]
+        variants = np.ones(len(cls.allvariants), dtype=bool)
+        return cls.filter_variants(guess, cls.feedback_0(guess, secret), variants)
+
+
+    @classmethod
+    def measure(cls, func, ops, repeat=5):
+        """ best time of 'repeat' runs, then the memory peak of one more run
+            returns {"ops_sec", "sec", "peak_kb"}
+        """
+        best = float("inf")
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return {"ops_sec": ops / best, "sec": best, "peak_kb": peak / 1024}
+
+
+    @staticmethod
+    def show_results(name, result, base=None):
+        """ one line per case, the change against the baseline in percent
+            (ops/sec: higher is better, memory: lower is better)
+        """
+        line = f'{name:18}: {result["ops_sec"]:>14,.1f} ops/s {result["peak_kb"]:>11,.0f} KB'
+        if base:
+            speed = (result["ops_sec"] / base["ops_sec"] - 1) * 100
+            memory = (result["peak_kb"] / max(base["peak_kb"], 1) - 1) * 100
+            line += f'  | {speed:+7.1f}% ops/s {memory:+7.1f}% KB'
+        print(line, flush=True)
+
+
+# ==========================================================
@@ -0,0 +1,100 @@
+""" Bounded Cache
+    LRU eviction with a memory budget
+"""
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+
+class LruCache:
+    """ a least-recently-used cache with a memory budget in bytes
+        get, put, resize, evict, clear, stats, add_stats, reset_stats
+    """
+    ENTRY = 100     # approx. bytes per entry for the dict node and its references
+
+    def __init__(self, budget):
+        self.budget = budget      # max. bytes
+        self.data = OrderedDict() # key: (value, size)
+        self.nbytes = 0           # used bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    def get(self, key, default=None):
+        """ value of 'key', the entry becomes the most recently used
+        """
+        try:
+            value, _ = self.data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """ stores a value, evicts the least recently used entries over budget
+        """
+        size = self.sizeof(key) + self.sizeof(value) + self.ENTRY
+        if size > self.budget:
+            return
+
+        if key in self.data:
+            self.nbytes -= self.data.pop(key)[1]
+        self.data[key] = value, size
+        self.nbytes += size
+        self.evict()
+
+    def resize(self, budget):
+        """ a new memory budget, a smaller one evicts the least recently used entries
+        """
+        self.budget = budget
+        self.evict()
+
+    def evict(self):
+        """ removes the least recently used entries until the cache fits the budget
+        """
+        while self.nbytes > self.budget:
+            _, (_, old_size) = self.data.popitem(last=False)
+            self.nbytes -= old_size
+            self.evictions += 1
+
+    def clear(self):
+        """ removes all entries, keeps the counters
+        """
+        self.data.clear()
+        self.nbytes = 0
+
+    def stats(self):
+        """ counters as a picklable dict
+        """
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def add_stats(self, stats):
+        """ adds the counters of another cache, e.g. of a worker process
+        """
+        self.hits += stats["hits"]
+        self.misses += stats["misses"]
+        self.evictions += stats["evictions"]
+
+    def reset_stats(self):
+        """ counters to zero
+        """
+        self.hits = self.misses = self.evictions = 0
+
+    @staticmethod
+    def sizeof(obj):
+        """ approx. memory of an entry part: numpy arrays, tuples and scalars
+        """
+        if isinstance(obj, np.ndarray):
+            return obj.nbytes
+        if isinstance(obj, tuple):
+            return sys.getsizeof(obj) + sum(sys.getsizeof(x) for x in obj)
+        return sys.getsizeof(obj)
+
+
+# ==========================================================
@@ -1,24 +1,47 @@
 """ Mastermind Core Routine
 """
 import random
-from itertools import product, permutations as perm
-from collections import Counter
-from functools import lru_cache
+from math import isqrt
+from time import perf_counter
+
+import numpy as np
 
 from .mami_setup import Setup
+from .mami_kernel import Kernel
+from .mami_space import VariantSpace
 
 
 class Calculation(Setup):
     """
     start_mastermind
+    start_exhaustive
+    walk_partition
     gen_allvariants
     gen_variants
     feedback
+    responses
+    filter_variants
+    pool_variants
+    candidate_classes
+    score_variants
+    score_worst_case
+    sample_variants
+    pick_guess
     get_guess
+    get_tree
+    tree_key
+    open_book
+    build_book
     random_mode
     knuth_mode
     kooi_mode
     irvi_mode
+    entropy_mode
+    genetic_mode
+    ga_random
+    ga_fitness
+    ga_offspring
+    ga_repair
     first_pattern
     """
 
@@ -29,9 +52,11 @@ class Calculation(Setup):
         columns = cls.columns
 
         # determines all solutions
+        # the variant pool is a mask over all solutions, all are possible
+        # a solver without pool (genetic) plays setups too large for the mask
         allvariants = cls.gen_allvariants()
-        variants    = allvariants.copy()
-        #variants    = deepcopy(allvariants)
+        pooled      = not (cls.algo in cls.ALGO_NOPOOL and (cls.statistic or cls.autosolver))
+        variants    = np.ones(len(allvariants), dtype=bool) if pooled else None
 
         # generates a single random code to be found
         if not code:
@@ -49,24 +74,40 @@ class Calculation(Setup):
 
         cls.secret = code
         prev_guesses = []
-        step = black = 0
-        while black < columns and step < cls.limit:
+        prev_answers = []
+        step = 0
+        answer = None
+        solved = Kernel.response(columns, 0, columns)
+
+        # phase timers, only in statistic mode
+        profile = cls.profile and cls.statistic
+        timer = cls.timer
+        tick = 0
+
+        while answer != solved and step < cls.limit:
             step += 1
+            if profile:
+                tick = perf_counter()
 
             # gets a guess
             if cls.statistic or cls.autosolver:
                 guess = cls.get_guess(step, variants, allvariants)
             else:
                 guess = cls.input_seq(f'?_{step:02}: ')
+            if profile:
+                tick = timer.lap("guess", step, tick)
 
-            # gets a feedback for 'guess' vs. 'code'
-            answer = black, _ = cls.feedback(guess, code)
+            # gets a feedback for 'guess' vs. 'code', encoded
+            answer = cls.feedback(guess, code)
+            if profile:
+                tick = timer.lap("feedback", step, tick)
 
             # Filters out those with the same answer pattern for the current guess
             # from the current variant pool. The current guess is omitted. The right
             # variant will always be there until the end.
-            # (-> bottle neck)
-            new_variants = [vari for vari in variants if cls.feedback(guess, vari) == answer]
+            new_variants = cls.filter_variants(guess, answer, variants) if pooled else None
+            if profile:
+                timer.lap("filter", step, tick)
 
             if not cls.statistic:
                 cls.show_guess(step, guess, new_variants, answer, variants)
@@ -74,38 +115,95 @@ class Calculation(Setup):
             # ready for a new guess
             variants = new_variants
             prev_guesses.append(guess)
+            prev_answers.append(answer)
 
             cls.prev_guesses = prev_guesses
+            cls.prev_answers = prev_answers
 
-        if black != columns and not cls.statistic:
+        if answer != solved and not cls.statistic:
             cls.show_gameover(code)
 
         # clear working variables
         cls.prev_guesses = []
+        cls.prev_answers = []
         cls.error_ct = 0
 
         return step
 
 
+    @classmethod
+    def start_exhaustive(cls, pb=None):
+        """ exact statistic of a deterministic algorithm:
+            walks its decision tree once over all secrets
+            returns the steps of every secret
+        """
+        allvariants = cls.gen_allvariants()
+        steps = []
+
+        cls.prev_guesses = []
+        cls.prev_answers = []
+        cls.walk_partition(np.ones(len(allvariants), dtype=bool), 1, steps, pb)
+
+        return steps
+
+
+    @classmethod
+    def walk_partition(cls, variants, step, steps, pb=None):
+        """ the guess for 'variants' splits them into groups by its feedback,
+            every group is the variant pool of the next step,
+            solved (or over the limit) at a single code group
+        """
+        columns = cls.columns
+        solved = Kernel.response(columns, 0, columns)
+
+        tick = perf_counter() if cls.profile else 0
+        guess = cls.get_guess(step, variants, cls.allvariants)
+        if cls.profile:
+            tick = cls.timer.lap("guess", step, tick)
+
+        # all feedbacks of the pool at once, the partition is the filter
+        pool = np.flatnonzero(variants)
+        resp = cls.responses([cls.allvariants.rank(guess)], pool)[0]
+        if cls.profile:
+            cls.timer.lap("filter", step, tick)
+
+        cls.prev_guesses.append(guess)
+        for answer in np.unique(resp):
+            hits = pool[resp == answer]
+
+            if answer == solved or step == cls.limit:
+                steps.extend([step] * len(hits))
+                for _ in hits:
+                    if pb:
+                        pb.update()
+            else:
+                group = np.zeros_like(variants)
+                group[hits] = True
+                cls.prev_answers.append(int(answer))
+                cls.walk_partition(group, step + 1, steps, pb)
+                cls.prev_answers.pop()
+        cls.prev_guesses.pop()
+
+
     @classmethod
     def gen_allvariants(cls):
-        """ generates a string set of all possible variants
+        """ the space of all possible variants
             from 'char_set' with the number of 'columns'
             w/  repetition: cartesian product
             w/o repetition: permutation
             product('ABCD', repeat=2) = AA AB AC AD BA BB BC BD CA CB CC CD DA DB DC DD
             permutations('ABCD', 2) =   AB AC AD BA BC BD CA CB CD DA DB DC
+            a variant is addressed by its rank, the strings are built on demand
         """
-        columns  = cls.columns
-        char_set = cls.char_set
+        # the same setup, already generated
+        vari_key = (tuple(cls.char_set), cls.columns, cls.repetition)
+        if vari_key == cls.vari_key:
+            return cls.allvariants
 
-        #string tuple of variants,
-        # product:     (cartesian product, equivalent to a nested for-loop)
-        # permutation: (r-length tuples, all possible orderings, no repeated elements)
-        vari = product(char_set, repeat=columns) if cls.repetition else perm(char_set, columns)
+        cls.allvariants = VariantSpace(cls.char_set, cls.columns, cls.repetition)
+        cls.vari_key = vari_key
 
-        # merge the single list to string & added to list of vari_strings
-        return ["".join(map(str, i)) for i in vari]
+        return cls.allvariants
 
 
     @classmethod
@@ -123,54 +221,55 @@ class Calculation(Setup):
 
 
     @classmethod
-    @lru_cache()   # not on processor mode
     def feedback(cls, guess, code):
         """ feedback switcher
+            with the bounded response cache in front
+            returns the encoded response, black * (columns+1) + white
         """
-        if not cls.fb_alternat:
-            return cls.feedback_0(guess, code)
-        else:
-            return cls.feedback_1(guess, code)
+        key = guess, code
+        result = cls.cache.get(key)
+
+        if cls.fb_alternat:
+            cls.fb_calls += 1       # feedb calls
+            if result is not None:
+                cls.fb_reused += 1  # fbL_reused
+
+        if result is None:
+            if not cls.fb_alternat:
+                result = cls.feedback_0(guess, code)
+            else:
+                result = cls.feedback_1(guess, code)
+            cls.cache.put(key, result)
+
+        return result
 
 
     @classmethod
-    @lru_cache()   # not on processor mode
     def feedback_0(cls, guess, code):
         """ tests 'guess' for 'code':
             black pin: char and position are correct
             white pin: char is correct, position is wrong
+            returns the encoded response
 
-            TOR: {guess: {code: (black, white),.. }, ... }
+            TOR file: response matrix (variants x variants)
         """
-        # if previous calculated and stored in database, use it
-        try:
-            return cls.tor[guess][code]
-        except KeyError:
-            pass
+        # if loaded from TOR file, use it
+        if cls.tor_loaded:
+            return int(cls.tor_imp[cls.allvariants.rank(guess), cls.allvariants.rank(code)])
 
         # forms pairs from both lists [(0. 0.) (1. 1.) ...], then compares both elements
         black = sum(x==y for x, y in zip(guess, code))
 
-        # counts frequency of characters / histogram
-        # returns the sum of the the smallest match
-        white = sum(min(guess.count(x), code.count(x)) for x in cls.char_set)
+        # cached histograms of both, the sum of the the smallest match
+        white = cls.allvariants.common(guess, code)
 
         # avoid double counting of white (even if black)
         white -= black
 
-        # store in Table_Of_Responses database
-        try:
-            cls.tor[guess]
-        except KeyError:
-            cls.tor[guess] = {}
-        finally:
-            cls.tor[guess][code] = black, white
-
-        return black, white       # integer
+        return Kernel.response(black, white, cls.columns)   # integer
 
 
     @classmethod
-    @lru_cache()   # not on processor mode
     def feedback_1(cls, guess, code):
         """ tests 'guess' for 'code':
             black pin: char and position are correct
@@ -181,84 +280,363 @@ class Calculation(Setup):
             random 1,600
             knuth, irvi, kooi: 2,000,000
 
-            TOR: {guess: {code: (black, white),.. }, ... }
+            TOR file: response matrix (variants x variants)
+            returns the encoded response
 
             routine with more statistic counter, slowier
         """
-        tor = cls.tor     # array/dict: this is a pointer operation to the same object, not a copy
-        tor_imp = cls.tor_imp     # file imported TOR
+        cls.fb_used += 1    # fbL_used
 
-        # if previous calculated and stored in database, use it
-        # change into int_transformed_numbers, smaller database
-        # but the change _here_ costs a lot of time
-        #c = int(code) if cls.numbers else int(w2n(code))
-        #g = int(guess) if cls.numbers else int(w2n(guess))
-        c = code
-        g = guess
+        # found fb in imported TOR
+        if cls.tor_loaded:
+            cls.fb_import += 1  # fbI_used
+            return int(cls.tor_imp[cls.allvariants.rank(guess), cls.allvariants.rank(code)])
 
-        cls.fb_calls += 1       # feedb calls
-        cls.fb_reused += 1      # fbL_reused
+        cls.fb_generated += 1  # new fb generated
 
-        try:
-            black, white = tor[g][c]
-        except KeyError:
-            cls.fb_reused -= 1  # fbL_reused
-            cls.fb_used += 1    # fbL_used
+        # forms pairs from both lists [(0. 0.) (1. 1.) ...], then compares both elements
+        black = sum(x==y for x, y in zip(guess, code))
 
-            cls.fb_import += 1  # fbI_used
-            try:
-                black, white = tor_imp[g][c]
-            except KeyError:
-                cls.fb_import -= 1     # found fb in imported TOR
-                cls.fb_generated += 1  # new fb generated
+        # cached histograms of both, the sum of the the smallest match
+        white = cls.allvariants.common(guess, code)
+
+        # avoid double counting of white (even if black)
+        white -= black
+
+        return Kernel.response(black, white, cls.columns)   # integer
+
+
+    @classmethod
+    def responses(cls, guesses, pool):
+        """ feedbacks of all 'guesses' vs. all 'pool' codes,
+            read from the TOR file or in one kernel call
+            guesses, pool: arrays of ranks in 'allvariants'
+            returns the encoded responses, array (guesses x pool)
+        """
+        if cls.tor_loaded:
+            return cls.tor_imp[np.ix_(guesses, pool)]
 
-                # forms pairs from both lists [(0. 0.) (1. 1.) ...], then compares both elements
-                black = sum(x==y for x, y in zip(guess, code))
+        space = cls.allvariants
+        black, white = Kernel.feedback_matrix(
+            space.codes(guesses), space.codes(pool), cls.char,
+            space.counts(guesses), space.counts(pool))
+        return Kernel.response(black, white, cls.columns)
 
-                # counts frequency of characters / histogram
-                # returns the sum of the the smallest match
-                white = sum(min(guess.count(x), code.count(x)) for x in cls.char_set)     # faster
-                #white = sum((Counter(guess) & Counter(code)).values())
 
-                # avoid double counting of white (even if black)
-                white -= black
+    @classmethod
+    def filter_variants(cls, guess, answer, variants):
+        """ keeps the variants with the same 'answer' for 'guess'
+            answer: encoded response
+            variants: pool mask over all solutions, returns a new mask
+        """
+        pool = np.flatnonzero(variants)
+        resp = cls.responses([cls.allvariants.rank(guess)], pool)[0]
+
+        new_variants = np.zeros_like(variants)
+        new_variants[pool[resp == answer]] = True
+        return new_variants
+
+
+    @classmethod
+    def pool_variants(cls, variants, count=None):
+        """ pool mask -> list of variant strings, the first 'count' ones
+        """
+        allvariants = cls.allvariants
+        return [allvariants[i] for i in np.flatnonzero(variants)[:count]]
+
+
+    @classmethod
+    def candidate_classes(cls, variants, allvariants):
+        """ the candidates: every not yet played variant of 'allvariants',
+            or samples over the work budget,
+            and those of them to be scored, one per symmetry class
+            variants: pool mask over all solutions
+            returns (candidates, pool, scored, inverse)
+            inverse: class of each candidate (index in 'scored'), None without classes
+        """
+        skip = [allvariants.rank(guess) for guess in cls.prev_guesses]
+        pool = np.flatnonzero(variants)
+
+        # over the work budget: only samples are scored (approximate)
+        sampled = cls.sample_budget and (len(allvariants) - len(skip)) * len(pool) > cls.sample_budget
+        if sampled:
+            candidates, pool = cls.sample_variants(pool, skip)
+        else:
+            candidates = np.delete(np.arange(len(allvariants)), skip)
+
+        # only one candidate per symmetry class is scored,
+        # all others of the class get the same score
+        # (worth it on the large pools of the early turns,
+        # not on samples, they are not closed under the symmetries)
+        if cls.symmetry and not sampled and len(pool) >= cls.SYMMETRY_POOL:
+            keys = Kernel.canonical(allvariants.codes(candidates), allvariants.codes(skip),
+                                    cls.char, cls.MAX_SYMMETRY)
+            _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+            return candidates, pool, candidates[first], inverse
+
+        return candidates, pool, candidates, None
+
+
+    @classmethod
+    def score_variants(cls, variants, allvariants):
+        """ partitions 'variants' by the feedback of every candidate
+            variants: pool mask over all solutions
+            returns the candidate ranks and their response histograms,
+            array (candidates x (columns+1)**2)
+        """
+        candidates, pool, scored, inverse = cls.candidate_classes(variants, allvariants)
+
+        histo = cls.histograms(scored, pool)
+        if inverse is not None:
+            histo = histo[inverse]
 
-            # store in Table_Of_Responses database (with int_transformed_numbers)
-            try:
-                tor[g]
-            except KeyError:
-                tor[g] = {}
-            finally:
-                tor[g][c] = black, white
+        return candidates, histo
 
-        #cls.tor = tor    # not necessary, array/dict: this is a pointer operation
 
-        return black, white       # integer
+    @classmethod
+    def histograms(cls, scored, pool):
+        """ response histograms of the candidate ranks 'scored' over the 'pool' ranks
+            array (scored x (columns+1)**2)
+        """
+        # splits the candidates, the response array is (part x pool)
+        part = max(1, Kernel.CHUNK // max(1, len(pool)))
+        histo = [Kernel.histogram(cls.responses(scored[i:i+part], pool), cls.columns)
+                 for i in range(0, len(scored), part)]
+        return np.concatenate(histo)
+
+
+    @classmethod
+    def score_worst_case(cls, variants, allvariants):
+        """ the largest partition of 'variants' for every candidate (Knuth),
+            branch and bound: the pool is scored slice by slice, a candidate is
+            dropped as soon as a partial partition exceeds the best worst case so far
+            - consistent candidates (in the pool) first, an early good bound
+            - dropped candidates get 'len(pool) + 1', never the minimum
+            - equal to the best is kept, the tie-break of 'pick_guess' is unchanged
+            returns the candidate ranks and their worst cases
+        """
+        candidates, pool, scored, inverse = cls.candidate_classes(variants, allvariants)
+
+        # small problems in a single pass, the bound would not pay off
+        if len(scored) * len(pool) < cls.PRUNE_WORK:
+            worst = cls.histograms(scored, pool).max(axis=1)
+            if inverse is not None:
+                worst = worst[inverse]
+            return candidates, worst
+
+        columns = cls.columns
+        step = -(-len(pool) // cls.PRUNE_SLICES)
+        part = max(1, min(Kernel.CHUNK // max(1, step), -(-len(scored) // cls.PRUNE_BLOCKS)))
+
+        # the consistent candidates are the first block, then the others
+        worst = np.full(len(scored), len(pool) + 1, dtype=np.int64)
+        in_pool = np.flatnonzero(variants[scored])
+        others = np.flatnonzero(~variants[scored])
+        blocks = [in_pool[i:i+part] for i in range(0, len(in_pool), part)]
+        blocks += [others[i:i+part] for i in range(0, len(others), part)]
+        bound = len(pool)
+
+        for block in blocks:
+            counts = np.zeros((len(block), (columns + 1) ** 2), dtype=np.int64)
+            alive = np.arange(len(block))
+
+            for j in range(0, len(pool), step):
+                resp = cls.responses(scored[block[alive]], pool[j:j+step])
+                counts[alive] += Kernel.histogram(resp, columns)
+                alive = alive[counts[alive].max(axis=1) <= bound]
+                if not len(alive):
+                    break
+
+            if len(alive):
+                worst[block[alive]] = counts[alive].max(axis=1)
+                bound = min(bound, int(worst[block[alive]].min()))
+
+        if inverse is not None:
+            worst = worst[inverse]
+
+        return candidates, worst
+
+
+    @classmethod
+    def sample_variants(cls, pool, skip):
+        """ samples of candidates and pool within 'sample_budget' evaluations
+            pool: ranks of the current pool, skip: ranks of the previous guesses
+            - the pool: a random part, the square root of the budget (sample_pool)
+            - the candidates: half from the pool (they can win at once),
+              the others from all variants, random or one per rank stratum (sample_strat)
+            returns the sorted arrays (candidate ranks, pool ranks)
+        """
+        budget = cls.sample_budget
+        rng = np.random.default_rng(random.getrandbits(64))
+
+        if cls.sample_pool and len(pool) > isqrt(budget):
+            pool = np.sort(rng.choice(pool, isqrt(budget), replace=False))
+        count = max(1, budget // len(pool))
+
+        # from the pool, at least one: the pool holds no previous guess,
+        # there is always a candidate left
+        in_pool = rng.choice(pool, min(len(pool), max(1, count // 2)), replace=False)
+
+        # from all variants
+        size = len(cls.allvariants)
+        count -= len(in_pool)
+        if cls.sample_strat:
+            edges = np.linspace(0, size, count + 1)
+            ranks = (edges[:-1] + rng.random(count) * np.diff(edges)).astype(np.int64)
+        else:
+            ranks = rng.integers(0, size, count)
+
+        candidates = np.union1d(in_pool, ranks)
+        return np.setdiff1d(candidates, skip), pool
+
+
+    @classmethod
+    def pick_guess(cls, candidates, scores, best, variants):
+        """ the important last part to reduce the average ...
+            get the candidate with the 'best' score,
+            primary from the current (reduced) pool / variants
+            otherwise the first one from the general pool / allvariants
+        """
+        best_ones = candidates[scores == best]
+        in_pool = best_ones[variants[best_ones]]
+        next_guess = in_pool[0] if len(in_pool) else best_ones[0]
+
+        return cls.allvariants[next_guess]
 
 
     @classmethod
     def get_guess(cls, step, variants, allvariants):
         """ selects an item from a list of variants:
+            the deterministic algorithms (2-4) depend only on the feedback path,
+            their guesses are calculated once and kept in a decision tree
         """
         algo = cls.algo
 
         if algo == 1:
             return cls.random_mode(step, variants)
+
+        if algo in cls.ALGO_NOPOOL:
+            return cls.genetic_mode(step)
+
+        # already known: feedback path -> next guess
+        # the path is the key of the pool, the same path always leads to the same pool
+        tree = cls.get_tree()
+        path = tuple(cls.prev_answers)
+        if path in tree:
+            cls.tree_hits += 1
+            return allvariants[tree[path]]
+        cls.tree_misses += 1
+
+        # a sampled node is random: with a seed, it depends on the path,
+        # not on the game (or worker) that reaches it first
+        if cls.sample_budget and cls.seed is not None:
+            random.seed(f'{cls.seed}-{algo}-{path}')
+
         if algo == 2:
-            return cls.knuth_mode(variants, allvariants)
-        if algo == 3:
-            return cls.kooi_mode(variants, allvariants)
-        if algo == 4:
-            return cls.irvi_mode(variants, allvariants)
+            guess = cls.knuth_mode(variants, allvariants)
+        elif algo == 3:
+            guess = cls.kooi_mode(variants, allvariants)
+        elif algo == 4:
+            guess = cls.irvi_mode(variants, allvariants)
+        else:
+            guess = cls.entropy_mode(variants, allvariants)
+
+        tree[path] = cls.allvariants.rank(guess)
+
+        return guess
+
+
+    @classmethod
+    def get_tree(cls):
+        """ decision tree of the current setup and algorithm
+            {(answer1, answer2, ..): rank of the next guess, ...}
+            built lazily, loaded from file on first use
+            a sampled solver has its own tree
+        """
+        tree_key = cls.tree_key()
+        tree = cls.trees.get(tree_key)
+        if tree is None:
+            tree = cls.trees[tree_key] = cls.load_tree_file(tree_key)
+            cls.open_book(tree_key, tree)
+        return tree
+
+
+    @classmethod
+    def tree_key(cls):
+        """ key of the decision tree of the current setup and algorithm
+            (char, columns, repetition, algo, sample)
+        """
+        sample = (cls.sample_budget, cls.sample_pool, cls.sample_strat) if cls.sample_budget else ()
+        return cls.char, cls.columns, cls.repetition, cls.algo, sample
+
+
+    @classmethod
+    def open_book(cls, tree_key, tree, build=False):
+        """ opening book: the first guess and all second guesses of an algorithm,
+            the first two levels of its decision tree, stored beside the TOR file
+            taken over into 'tree', computed once if not stored yet
+            - computed only to be stored (tor_help) or on request ('build'),
+              a single game needs only one second guess, the tree grows lazily
+            - sampled solvers have no book
+        """
+        if not cls.opening_book or tree_key[-1] or cls.len_variants() > cls.MAX_BOOK:
+            return
+
+        book = cls.load_book_file(tree_key)
+        if book is None:
+            if not (cls.tor_help or build):
+                return
+            tick = perf_counter()
+            book = cls.build_book()
+            if cls.tor_help:
+                cls.save_book_file(tree_key, book)
+            cls.timer.lap("book", 0, tick)
+
+        for path, rank in book.items():
+            tree.setdefault(path, rank)
+
+
+    @classmethod
+    def build_book(cls):
+        """ the first guess and the second guess for every answer to it
+            (the decision tree of the current algorithm grows with them)
+            returns the book {(): rank, (answer,): rank, ..}
+        """
+        allvariants = cls.gen_allvariants()
+        variants = np.ones(len(allvariants), dtype=bool)
+        solved = Kernel.response(cls.columns, 0, cls.columns)
+        prev = cls.prev_guesses, cls.prev_answers
+
+        try:
+            cls.prev_guesses, cls.prev_answers = [], []
+            guess = cls.get_guess(1, variants, allvariants)
+            book = {(): allvariants.rank(guess)}
+
+            # the pool of every answer, as in 'walk_partition'
+            pool = np.flatnonzero(variants)
+            resp = cls.responses([book[()]], pool)[0]
+            cls.prev_guesses = [guess]
+            for answer in np.unique(resp):
+                if answer == solved:
+                    continue
+                group = np.zeros_like(variants)
+                group[pool[resp == answer]] = True
+                cls.prev_answers = [int(answer)]
+                guess = cls.get_guess(2, group, allvariants)
+                book[(int(answer),)] = allvariants.rank(guess)
+        finally:
+            cls.prev_guesses, cls.prev_answers = prev
+
+        return book
 
 
     @classmethod
     def random_mode(cls, step, variants):
-        """ (1) selects a random element from the 'variants' list
+        """ (1) selects a random element from the 'variants' pool
             random modify: calculate the first one, only in manual mode
         """
         if  cls.statistic or step > 1:
-            return random.sample(variants, 1)[0]    # string
+            return cls.allvariants[random.choice(np.flatnonzero(variants))]    # string
 
         # step == 1, special first pattern
         else:
@@ -273,8 +651,8 @@ class Calculation(Setup):
             res = []
             for guess in first:
                 answer = cls.feedback(guess, cls.secret)
-                new_variants = [vari for vari in variants if cls.feedback(guess, vari) == answer]
-                res.append((guess, len(new_variants)))
+                new_variants = cls.filter_variants(guess, answer, variants)
+                res.append((guess, np.count_nonzero(new_variants)))
 
             return min(res, key=lambda x: x[1])[0]
 
@@ -285,60 +663,23 @@ class Calculation(Setup):
             1st best pattern: '1122' -- does not necessarily have to be calculated
             this realisation based: https://github.com/Joshua-Noble/Mastermind-Solver
         """
+        len_pool = np.count_nonzero(variants)
         # first
-        if len(variants) == len(allvariants):
+        if len_pool == len(allvariants):
             return cls.first_pattern(0)
         # last
-        if len(variants) == 1:
-            return variants[0]
-
-        best_max = []
-        for allvari in allvariants:
-            # skip previous guesses
-            if not allvari in cls.prev_guesses:
-                # store feedbacks (allvari_vs_variants) and vari
-                # sorted by feedback
-                # [((0,0),v1), ((0,0),v9), ((0,1),v21), ...]
-                #data = [(feedback(allvari, var), var) for var in variants]
-                #data = sorted(data, key=lambda x: x[0])   # sort by first element
-
-                # variants grouped by feedbacks
-                # groups: [(feedb1, group1),..]
-                # [((0,0), [v1,v9,...]), ((0,1), [v10,v21,v87,...]), ...]
-                #groups = groupby(data, lambda x: x[0])    # group by first element
-
-                # counts lenght of group1/group2/...
-                # and returns the highest
-                #max_grp = 0
-                #for _, group in groups:
-                #    max_grp = max(max_grp, len(list(group)))
-
-                histo = Counter(cls.feedback(allvari, var) for var in variants)
-                max_grp = max(histo.values())
-
-                # store allvari and its max_grp,
-                # the feedback with the greatest response
-                best_max.append((allvari, max_grp))
+        if len_pool == 1:
+            return cls.pool_variants(variants)[0]
+
+        # variants grouped by feedbacks,
+        # the highest group count of each candidate, the feedback with the greatest response
+        # (candidates above the best one are not scored to the end)
+        candidates, max_grp = cls.score_worst_case(variants, allvariants)
 
         # the lowest of high group counts // the worst case
-        min_grp = min(best_max, key=lambda x: x[1])[1]
-
-        # the important last part to reduce the average ...
-        # get the min_variant for the best worst-case-senario
-        # primary from the current (reduced) pool / variants
-        # otherwise the first one from the general pool / allvariants
-        first = True
-        next_guess = ""
-        for allvari, max_grp in best_max:
-            if max_grp == min_grp:
-                if allvari in variants:
-                    next_guess = allvari
-                    break
-                if first:
-                    next_guess = allvari
-                    first = False
+        min_grp = max_grp.min()
 
-        return next_guess
+        return cls.pick_guess(candidates, max_grp, min_grp, variants)
 
 
     @classmethod
@@ -346,90 +687,232 @@ class Calculation(Setup):
         """ (3) Kooi (most-parts-strategy), most best average
             1st best pattern '1123' or '1234'
         """
+        len_pool = np.count_nonzero(variants)
         # first
-        if len(variants) == len(allvariants):
+        if len_pool == len(allvariants):
             return cls.first_pattern(1)
         # last
-        if len(variants) == 1:
-            return variants[0]
-
-        fdb_counter = []
-        for allvari in allvariants:
-            # skip previous guesses
-            if not allvari in cls.prev_guesses:
-                # store feedbacks (allvari_vs_variants)
-                # [(0,0), (0,0), (0,1), ...]
+        if len_pool == 1:
+            return cls.pool_variants(variants)[0]
 
-                # Counter(): merge feedbs and count it, dict((0,0):ct1, (0,1):ct2, ...)
-                # len(): counts the feedbacks in the dict
-                # store allvari and its feedback_counter
-                count_fdb = len(Counter(cls.feedback(allvari, var) for var in variants))
+        candidates, histo = cls.score_variants(variants, allvariants)
 
-                fdb_counter.append((allvari, count_fdb))
+        # counts the different feedbacks of each candidate
+        count_fdb = np.count_nonzero(histo, axis=1)
 
         # the highest feedback_counter
-        max_fdb = max(fdb_counter, key=lambda x: x[1])[1]
-
-        # the important last part to reduce the average ...
-        # get the max_variant ...
-        # primary from the current (reduced) pool / variants
-        # otherwise the first one from the general pool / allvariants
-        first = True
-        next_guess = ""
-        for allvari, count_fdb in fdb_counter:
-            if count_fdb == max_fdb:
-                if allvari in variants:
-                    next_guess = allvari
-                    break
-                if first:
-                    next_guess = allvari
-                    first = False
+        max_fdb = count_fdb.max()
 
-        return next_guess
+        return cls.pick_guess(candidates, count_fdb, max_fdb, variants)
 
 
     @classmethod
     def irvi_mode(cls, variants, allvariants):
         """ (4) Irving (expected-size-strategy), 1st best pattern '1123'
         """
+        len_pool = np.count_nonzero(variants)
         # first
-        if len(variants) == len(allvariants):
+        if len_pool == len(allvariants):
             return cls.first_pattern(1)
         # last
-        if len(variants) == 1:
-            return variants[0]
-
-        exp_size = []
-        for allvari in allvariants:
-            # skip previous guesses
-            if not allvari in cls.prev_guesses:
-                histo = Counter(cls.feedback(allvari, var) for var in variants)
-                expsize = 0
-                for value in histo.values():
-                    expsize += value**2
-                expsize /= cls.len_vari
-                exp_size.append((allvari, expsize))
+        if len_pool == 1:
+            return cls.pool_variants(variants)[0]
+
+        candidates, histo = cls.score_variants(variants, allvariants)
+
+        exp_size = (histo.astype(np.int64) ** 2).sum(axis=1) / cls.len_vari
 
         # the lowest
-        min_size = min(exp_size, key=lambda x: x[1])[1]
-
-        # the important last part to reduce the average ...
-        # get the min_variant ...
-        # primary from the current (reduced) pool / variants
-        # otherwise the first one from the general pool / allvariants
-        first = True
-        next_guess = ""
-
-        for allvari, expsize in exp_size:
-            if expsize == min_size:
-                if allvari in variants:
-                    next_guess = allvari
-                    break
-                if first:
-                    next_guess = allvari
-                    first = False
+        min_size = exp_size.min()
+
+        return cls.pick_guess(candidates, exp_size, min_size, variants)
+
+
+    @classmethod
+    def entropy_mode(cls, variants, allvariants):
+        """ (5) Entropy (maximum-information-strategy), 1st best pattern '1123'
+            the Shannon entropy of the partition: log2(n) - sum(c * log2(c)) / n,
+            the highest entropy is the lowest sum(c * log2(c)) of the group sizes c
+        """
+        len_pool = np.count_nonzero(variants)
+        # first
+        if len_pool == len(allvariants):
+            return cls.first_pattern(1)
+        # last
+        if len_pool == 1:
+            return cls.pool_variants(variants)[0]
+
+        candidates, histo = cls.score_variants(variants, allvariants)
 
-        return next_guess
+        # empty groups count 0, log2(1) == 0
+        histo = histo.astype(np.float64)
+        info = (histo * np.log2(np.maximum(histo, 1))).sum(axis=1)
+
+        # rounded, equal partitions are equal scores in any order of the groups
+        info = info.round(9)
+
+        # the lowest
+        min_info = info.min()
+
+        return cls.pick_guess(candidates, info, min_info, variants)
+
+
+    @classmethod
+    def genetic_mode(cls, step):
+        """ (6) Genetic (Berghman et al.), for setups too large to enumerate,
+            1st best pattern '1123'
+            a population of codes evolves towards the previous feedbacks,
+            the eligible codes (consistent with all of them) are collected,
+            the guess is the eligible one with the most parts among them (Kooi)
+            works without variant pool and 'allvariants'
+            the population of a turn is the start of the next one
+        """
+        # first
+        if step == 1:
+            cls.ga_pop = None
+            return cls.first_pattern(1)
+
+        rng = np.random.default_rng(random.getrandbits(64))
+        guesses = Kernel.encode(cls.prev_guesses, cls.char_set)
+        black, white = np.divmod(np.array(cls.prev_answers, dtype=np.int16), cls.columns + 1)
+
+        # the eligible codes as integer keys, base 'char'
+        weight = cls.char ** np.arange(cls.columns - 1, -1, -1, dtype=np.int64)
+        keys = np.empty(0, dtype=np.int64)
+
+        pop = cls.ga_pop
+        if pop is None or len(pop) != cls.ga_population:
+            pop = cls.ga_random(cls.ga_population, rng)
+        limit = cls.ga_generations
+        stall = 0
+
+        # more generations only as long as no eligible code is found,
+        # less if no new one is found for a while (there are not more)
+        for gen in range(limit * cls.GA_EXTRA):
+            fit = cls.ga_fitness(pop, guesses, black, white)
+            best = fit.argmin()
+            fittest = pop[[best]]
+            if fit[best] == 0:
+                found = len(keys)
+                keys = np.union1d(keys, pop[fit == 0].astype(np.int64) @ weight)
+                stall = 0 if len(keys) > found else stall + 1
+            if (len(keys) >= cls.GA_ELIGIBLE or stall >= cls.GA_STALL
+                    or (gen + 1 >= limit and len(keys))):
+                break
+            pop = cls.ga_offspring(pop, fit, rng)
+        cls.ga_pop = pop
+
+        # none found, the fittest one
+        if not len(keys):
+            return Kernel.decode(fittest, cls.char_set)[0]
+
+        eligible = (keys[:, np.newaxis] // weight % cls.char).astype(np.uint8)
+
+        # last
+        if len(eligible) == 1:
+            return Kernel.decode(eligible, cls.char_set)[0]
+
+        # the eligible codes as their own pool, counts the different feedbacks
+        resp = Kernel.response(*Kernel.feedback_matrix(eligible, eligible, cls.char), cls.columns)
+        count_fdb = np.count_nonzero(Kernel.histogram(resp, cls.columns), axis=1)
+
+        return Kernel.decode(eligible[[count_fdb.argmax()]], cls.char_set)[0]
+
+
+    @classmethod
+    def ga_random(cls, size, rng):
+        """ 'size' random codes, array (size x columns)
+        """
+        if cls.repetition:
+            return rng.integers(cls.char, size=(size, cls.columns), dtype=np.uint8)
+
+        # the first columns of a random order of all characters
+        order = np.argsort(rng.random((size, cls.char)), axis=1)
+        return order[:, :cls.columns].astype(np.uint8)
+
+
+    @classmethod
+    def ga_fitness(cls, pop, guesses, black, white):
+        """ distance of every code to the previous feedbacks,
+            sum of the pin differences over all guesses, 0: eligible
+            guesses: array (guesses x columns), black, white: their pins
+        """
+        b, w = Kernel.feedback_matrix(guesses, pop, cls.char)
+        diff = (np.abs(b.astype(np.int16) - black[:, np.newaxis])
+                + np.abs(w.astype(np.int16) - white[:, np.newaxis]))
+        return diff.sum(axis=0)
+
+
+    @classmethod
+    def ga_offspring(cls, pop, fit, rng):
+        """ next generation, parents from the fitter half:
+            one- or two-point crossover, then mutation, permutation and inversion
+        """
+        size, columns = pop.shape
+        rows = np.arange(size)
+        cols = np.arange(columns)
+
+        parents = pop[np.argsort(fit, kind="stable")[:max(2, size // 2)]]
+        mother = parents[rng.integers(len(parents), size=size)]
+        father = parents[rng.integers(len(parents), size=size)]
+
+        # crossover: the columns between both cut points from the father,
+        # one-point: the second cut at the end
+        cut = np.sort(rng.integers(columns + 1, size=(size, 2)), axis=1)
+        cut[rng.random(size) < 0.5, 1] = columns
+        child = np.where((cols >= cut[:, :1]) & (cols < cut[:, 1:]), father, mother)
+
+        # mutation: a random color at a random column
+        hit = rows[rng.random(size) < cls.GA_MUTATION]
+        child[hit, rng.integers(columns, size=len(hit))] = rng.integers(cls.char, size=len(hit))
+
+        # permutation: two columns swapped
+        hit = rows[rng.random(size) < cls.GA_PERMUTATION]
+        one, two = rng.integers(columns, size=(2, len(hit)))
+        child[hit, one], child[hit, two] = child[hit, two], child[hit, one]
+
+        # inversion: the columns between two points reversed
+        hit = rows[rng.random(size) < cls.GA_INVERSION]
+        one, two = np.sort(rng.integers(columns, size=(2, len(hit))), axis=0)
+        inside = (cols >= one[:, np.newaxis]) & (cols <= two[:, np.newaxis])
+        source = np.where(inside, (one + two)[:, np.newaxis] - cols, cols)
+        child[hit] = np.take_along_axis(child[hit], source, axis=1)
+
+        if not cls.repetition:
+            cls.ga_repair(child, cls.char, rng)
+
+        # doubles are replaced by random codes, the population stays diverse
+        weight = cls.char ** np.arange(columns - 1, -1, -1, dtype=np.int64)
+        _, first = np.unique(child.astype(np.int64) @ weight, return_index=True)
+        double = np.ones(size, dtype=bool)
+        double[first] = False
+        child[double] = cls.ga_random(int(double.sum()), rng)
+
+        return child
+
+
+    @staticmethod
+    def ga_repair(pop, char, rng):
+        """ without repetition: a repeated color is replaced by an unused one,
+            in place
+        """
+        size, columns = pop.shape
+
+        # a color already seen in a column before
+        same = pop[:, :, np.newaxis] == pop[:, np.newaxis, :]
+        repeated = np.tril(same, k=-1).any(axis=2)
+        if not repeated.any():
+            return
+
+        # the unused colors of each code, in a random order
+        prio = rng.random((size, char))
+        prio[Kernel.color_counts(pop, char) > 0] = np.inf
+        unused = np.argsort(prio, axis=1)
+
+        # the n-th repeated column gets the n-th unused color
+        nth = np.cumsum(repeated, axis=1) - 1
+        rows, cols = np.nonzero(repeated)
+        pop[rows, cols] = unused[rows, nth[rows, cols]]
 
 
     @classmethod
@@ -2,77 +2,405 @@
 """
 from pathlib import Path
 from datetime import datetime
+from time import perf_counter
+from itertools import islice
+import threading
+from multiprocessing import shared_memory
+import csv
+import json
 import pickle
-import bz2
+
+import numpy as np
 
 from .mami_init import Init
+from .mami_kernel import Kernel
+from .mami_space import VariantSpace
 
 
 class File(Init):
     """
     load_tor_file
+    prefetch_tor
+    join_tor
+    release_tor
+    share_tor
+    attach_tor
     save_tor_file
+    write_tor
+    fill_tor
+    tor_filename
+    tor_shard
+    load_tree_file
+    save_tree_files
+    compact_tree_file
+    compact_tree_files
+    load_book_file
+    save_book_file
+    book_filename
     store_stat_header_to_file
     store_stat_to_file
+    store_stat_record
+    flat_record
     """
 
     @classmethod
     def load_tor_file(cls):
-        """ TOR: {guess: {code: (black, white),..}, ... }
+        """ TOR: response matrix (variants x variants) of the current setup,
+            one encoded response (black * (columns+1) + white) per guess/code pair,
+            indexed by the ranks of both in 'allvariants'
+            one file (shard) per setup, generated once, opened as memory map
+            only the shard of the current setup is attached
         """
-        path_to_load = Path(cls.MY_PATH, cls.TOR_DIR)
+        tor_key = cls.tor_shard()
 
-        if cls.tor_help:
-            if cls.tor_loaded:
+        if cls.tor_help and cls.len_variants() <= cls.MAX_TOR:
+            if cls.tor_loaded and cls.tor_key == tor_key:
                 return
 
-            filename = Path(path_to_load, cls.TOR_NAME + ".bz2")
-            cls.tor_imp.clear()
-            cls.tor.clear()
-            tor = {}
-
-            print("Table_Of_Responses " + cls.lang['loading'] + " ... ", end="", flush=True)
+            filename = cls.tor_filename()
+            cls.gen_allvariants()
+            tick = perf_counter()
 
-            if Path(filename).is_file():
-                file = bz2.BZ2File(filename, "r")
-                tor = pickle.load(file)
-                file.close()
+            # already in the background, waits for the rest
+            tor_imp = cls.join_tor(tor_key)
+            if tor_imp is None:
+                if Path(filename).is_file():
+                    print("Table_Of_Responses " + cls.lang['loading'] + " ... ",
+                          end="", flush=True)
+                else:
+                    print("Table_Of_Responses " + cls.lang['generating'] + " ... ",
+                          end="", flush=True)
+                    cls.save_tor_file()
+                    tick = cls.timer.lap("tor save", 0, tick)
                 print(cls.lang['done']+"\n")
-            else:
-                print(cls.lang['nfound']+"\n")
 
-            cls.tor_imp = tor.copy()
-            if not cls.fb_alternat:
-                cls.tor = tor
+                # memory map, only the used pages are read from disk
+                tor_imp = np.load(filename, mmap_mode="r")
+
+            cls.tor_imp = tor_imp
+            cls.timer.lap("tor load", 0, tick)
 
             cls.tor_loaded = True
-            cls.tor_loaded_len = sum([len(tor[x]) for x in tor])
+            cls.tor_key = tor_key
+            cls.tor_loaded_len = cls.tor_imp.size
 
         # without TOR_file
         elif cls.tor_loaded:
-            cls.tor.clear()
-            cls.tor_imp.clear()
-            cls.tor_loaded = False
-            cls.tor_loaded_len = 0
+            cls.release_tor()
+
+
+    @classmethod
+    def prefetch_tor(cls):
+        """ loads or generates the TOR shard of the current setup
+            in a background thread, e.g. during the setup questions,
+            'load_tor_file' takes it over
+        """
+        tor_key = cls.tor_shard()
+        if (not cls.tor_help or cls.len_variants() > cls.MAX_TOR
+                or (cls.tor_loaded and cls.tor_key == tor_key)
+                or (cls.tor_thread and cls.tor_thread[0] == tor_key)):
+            return
+
+        # own variant space, the shared class state is not touched
+        filename = cls.tor_filename()
+        space = VariantSpace(cls.char_set, cls.columns, cls.repetition)
+        result = []
+
+        def load():
+            try:
+                if not filename.is_file():
+                    cls.write_tor(filename, space.codes(), space.char, space.columns)
+                result.append(np.load(filename, mmap_mode="r"))
+            except OSError:
+                pass    # 'load_tor_file' tries again in the foreground
+
+        thread = threading.Thread(target=load, name="tor_prefetch", daemon=True)
+        thread.start()
+        cls.tor_thread = tor_key, thread, result
+
+
+    @classmethod
+    def join_tor(cls, tor_key):
+        """ waits for the background load of the 'tor_key' shard
+            returns its memory map, None without it
+        """
+        if not cls.tor_thread or cls.tor_thread[0] != tor_key:
+            return None
+
+        _, thread, result = cls.tor_thread
+        thread.join()
+        cls.tor_thread = None
+        return result[0] if result else None
+
+
+    @classmethod
+    def release_tor(cls):
+        """ detaches the TOR shard, its memory map is closed
+            when the last reference is gone
+        """
+        cls.tor_imp = None
+        cls.tor_loaded = False
+        cls.tor_key = ()
+        cls.tor_loaded_len = 0
+
+
+    @classmethod
+    def share_tor(cls):
+        """ response matrix of the current setup in a shared memory block,
+            built once in the main process, attached read-only by every worker
+            a loaded TOR file is already shared by its memory map, not needed then
+            returns the block (to close and unlink after the run), None without it
+        """
+        if not cls.worker_tor or cls.tor_loaded or cls.len_variants() > cls.MAX_TOR:
+            return None
+
+        cls.gen_allvariants()
+        codes = cls.allvariants.codes()
+        dtype = np.dtype(Kernel.dtype(cls.columns))
+        shape = len(codes), len(codes)
+        try:
+            block = shared_memory.SharedMemory(create=True, size=dtype.itemsize * shape[0] * shape[1])
+        except OSError:
+            return None     # no shared memory, the workers calculate their responses
+
+        tor = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        cls.fill_tor(tor, codes, cls.char, cls.columns)
+        del tor
+        cls.tor_shared = block.name, shape, dtype.str
+        return block
+
+
+    @classmethod
+    def attach_tor(cls, spec):
+        """ attaches the shared response matrix 'spec' (name, shape, dtype)
+            read-only, in place of a TOR file
+        """
+        name, shape, dtype = spec
+        try:
+            block = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:   # python < 3.13
+            block = shared_memory.SharedMemory(name=name)
+
+        tor = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        tor.flags.writeable = False
+
+        cls.tor_block = block
+        cls.tor_imp = tor
+        cls.tor_loaded = True
+        cls.tor_key = cls.tor_shard()
+        cls.tor_loaded_len = tor.size
 
 
     @classmethod
     def save_tor_file(cls):
-        """ save the TOR to file
+        """ generates the TOR of the current setup and stores it to file
+        """
+        cls.write_tor(cls.tor_filename(), cls.allvariants.codes(), cls.char, cls.columns)
+
+
+    @staticmethod
+    def write_tor(filename, codes, char, columns):
+        """ response matrix of all 'codes' to file,
+            part by part straight into the memory map
+        """
+        # written to a temporary file first, a complete TOR file or none
+        temp = filename.with_suffix(".tmp")
+        tor = np.lib.format.open_memmap(
+            temp, mode="w+", dtype=Kernel.dtype(columns), shape=(len(codes), len(codes)))
+
+        File.fill_tor(tor, codes, char, columns)
+
+        tor.flush()
+        del tor
+        temp.replace(filename)
+
+
+    @staticmethod
+    def fill_tor(tor, codes, char, columns):
+        """ response matrix of all 'codes' into the array 'tor' (codes x codes),
+            part by part
+        """
+        len_vari = len(codes)
+        part = max(1, Kernel.CHUNK // len_vari)
+        counts = Kernel.color_counts(codes, char)
+
+        for i in range(0, len_vari, part):
+            black, white = Kernel.feedback_matrix(
+                codes[i:i+part], codes, char, count_g=counts[i:i+part], count_c=counts)
+            tor[i:i+part] = Kernel.response(black, white, columns)
+
+
+    @classmethod
+    def tor_shard(cls):
+        """ key of the TOR shard of the current setup: (char, columns, repetition)
+            digits and letters share a shard, the responses are indexed by rank
+        """
+        return cls.char, cls.columns, cls.repetition
+
+
+    @classmethod
+    def tor_filename(cls):
+        """ TOR file of the current setup
+            'tor_6_4_r.npy': 6 characters, 4 columns, with repetition
+        """
+        rep = "r" if cls.repetition else "u"
+        name = f'{cls.TOR_NAME}_{cls.char}_{cls.columns}_{rep}.npy'
+        return Path(cls.MY_PATH, cls.TOR_DIR, name)
+
+
+    @classmethod
+    def load_tree_file(cls, tree_key):
+        """ decision tree of a setup and algorithm from file:
+            the main file and the appended nodes of its delta log
+            tree_key: (char, columns, repetition, algo, sample)
+            trees of sampled solvers are random, never stored
+        """
+        tree = {}
+        filename = cls.tree_filename(tree_key)
+        delta = filename.with_suffix(".log")
+        nodes = 0
+
+        if cls.tree_store and not tree_key[-1]:
+            if filename.is_file():
+                with open(filename, "rb") as file:
+                    tree = pickle.load(file)
+
+            # one pickled list of (path, guess) per save,
+            # an incomplete last record (aborted save) is ignored
+            if delta.is_file():
+                with open(delta, "rb") as file:
+                    while True:
+                        try:
+                            items = pickle.load(file)
+                        except (EOFError, pickle.UnpicklingError):
+                            break
+                        tree.update(items)
+                        nodes += len(items)
+
+        cls.trees_saved[tree_key] = len(tree)
+        cls.trees_delta[tree_key] = nodes
+        return tree
+
+
+    @classmethod
+    def save_tree_files(cls):
+        """ save the grown decision trees to file:
+            only the new nodes are appended to the delta log,
+            compacted into the main file above 'TREE_COMPACT'
+        """
+        if not cls.tree_store:
+            return
+
+        for tree_key, tree in cls.trees.items():
+            saved = cls.trees_saved.get(tree_key, 0)
+            if tree_key[-1] or len(tree) <= saved:
+                continue
+
+            # a tree only grows, the new nodes are the last ones
+            items = list(islice(tree.items(), saved, None))
+            with open(cls.tree_filename(tree_key).with_suffix(".log"), "ab") as file:
+                pickle.dump(items, file)
+
+            cls.trees_saved[tree_key] = len(tree)
+            cls.trees_delta[tree_key] = cls.trees_delta.get(tree_key, 0) + len(items)
+
+            if cls.trees_delta[tree_key] > cls.TREE_COMPACT * len(tree):
+                cls.compact_tree_file(tree_key, tree)
+
+
+    @classmethod
+    def compact_tree_file(cls, tree_key, tree=None):
+        """ main file and delta log -> a new main file, without delta log
+        """
+        filename = cls.tree_filename(tree_key)
+        if tree is None:
+            tree = cls.load_tree_file(tree_key)
+
+        # written to a temporary file first, a complete main file or the old one
+        temp = filename.with_suffix(".tmp")
+        with open(temp, "wb") as file:
+            pickle.dump(tree, file)
+        temp.replace(filename)
+        filename.with_suffix(".log").unlink(missing_ok=True)
+
+        cls.trees_saved[tree_key] = len(tree)
+        cls.trees_delta[tree_key] = 0
+
+
+    @classmethod
+    def compact_tree_files(cls):
+        """ compacts every tree file with a delta log, explicit call
+            returns the number of compacted files
+        """
+        tree_store, cls.tree_store = cls.tree_store, True
+        count = 0
+        try:
+            for delta in Path(cls.MY_PATH, cls.TOR_DIR).glob(f'{cls.TREE_NAME}_*.log'):
+                _, char, columns, rep, algo = delta.stem.rsplit("_", 4)
+                cls.compact_tree_file((int(char), int(columns), rep == "r", int(algo), ()))
+                count += 1
+        finally:
+            cls.tree_store = tree_store
+        return count
+
+
+    @classmethod
+    def tree_filename(cls, tree_key):
+        """ decision tree file of a setup and algorithm
+            'tree_6_4_r_2.pkl': 6 characters, 4 columns, with repetition, Knuth
+            its delta log: 'tree_6_4_r_2.log'
         """
-        if cls.tor_loaded:
-            path_to_store = Path(cls.MY_PATH, cls.TOR_DIR)
-            filename = Path(path_to_store, cls.TOR_NAME + ".bz2")
+        char, columns, repetition, algo, _ = tree_key
+        rep = "r" if repetition else "u"
+        name = f'{cls.TREE_NAME}_{char}_{columns}_{rep}_{algo}.pkl'
+        return Path(cls.MY_PATH, cls.TOR_DIR, name)
 
-            tor_len = sum([len(v) for k, v in cls.tor.items()])
 
-            if tor_len > cls.tor_loaded_len:
-                print("\n" + "Table_Of_Responses " + cls.lang['storing'] + " ... ", end="")
-                file = bz2.BZ2File(filename, "w")
-                pickle.dump(cls.tor, file)
-                file.close()
-                print(cls.lang['done'])
-                cls.tor_loaded_len = tor_len
+    @classmethod
+    def load_book_file(cls, tree_key):
+        """ opening book of a setup and algorithm from file
+            {(): rank of the first guess, (answer1,): rank of the second guess, ..}
+            returns None without file
+        """
+        filename = cls.book_filename(tree_key)
+        if not filename.is_file():
+            return None
+
+        try:
+            with open(filename, "rb") as file:
+                return pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None     # damaged or not readable, computed again
+
+
+    @classmethod
+    def save_book_file(cls, tree_key, book):
+        """ stores an opening book beside the TOR files
+            returns False if not writable, the book stays in memory only
+        """
+        filename = cls.book_filename(tree_key)
+
+        # written to a temporary file first, a complete book or none
+        temp = filename.with_suffix(".tmp")
+        try:
+            filename.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp, "wb") as file:
+                pickle.dump(book, file)
+            temp.replace(filename)
+        except OSError:
+            return False    # a partial temporary file is overwritten next time
+        return True
+
+
+    @classmethod
+    def book_filename(cls, tree_key):
+        """ opening book file of a setup and algorithm
+            'book_6_4_r_2.pkl': 6 characters, 4 columns, with repetition, Knuth
+        """
+        char, columns, repetition, algo, _ = tree_key
+        rep = "r" if repetition else "u"
+        name = f'{cls.BOOK_NAME}_{char}_{columns}_{rep}_{algo}.pkl'
+        return Path(cls.MY_PATH, cls.TOR_DIR, name)
 
 
     @classmethod
@@ -105,7 +433,13 @@ class File(Init):
                 f'{cls.lang['col']:18}: {cls.columns}\n'
                 f'{cls.lang['solu'].capitalize():18}: {cls.len_vari:,d}\n'
                 f'{"TOR_"+cls.lang['file']:18}: {cls.tor_help}\n'
-                f'{cls.lang['runs'].capitalize():18}: {cls.stat_runs:,}\n\n'
+                f'{cls.lang['exact']:18}: {cls.stat_exact}\n'
+                f'{cls.lang['sample']:18}: {cls.sample_budget:,d}\n'
+                f'{cls.lang['profile']:18}: {cls.profile}\n'
+                f'{cls.lang['ga_pop']:18}: {cls.ga_population:,d}\n'
+                f'{cls.lang['ga_gen']:18}: {cls.ga_generations:,d}\n'
+                f'{cls.lang['runs'].capitalize():18}: {cls.runs():,}\n'
+                f'{cls.lang['workers']:18}: {cls.workers}\n\n'
             )
             msg_head += msg_date + msg_setup
 
@@ -125,4 +459,45 @@ class File(Init):
             file.write(stat_msg)
 
 
+    @classmethod
+    def store_stat_record(cls, record):
+        """ appends a statistic record beside the stats log,
+            one json line or csv row per algorithm and run
+        """
+        if cls.stat_format not in ("jsonl", "csv"):
+            return
+
+        stat_file = Path(cls.MY_PATH, cls.STAT_DIR, f'{cls.STAT_FILE}.{cls.stat_format}')
+
+        if cls.stat_format == "jsonl":
+            with open(stat_file, "a", encoding="utf-8") as file:
+                file.write(json.dumps(record) + "\n")
+            return
+
+        # the columns of an existing file are kept
+        row = cls.flat_record(record)
+        fieldnames = list(row)
+        new = not stat_file.is_file()
+        if not new:
+            with open(stat_file, newline="", encoding="utf-8") as file:
+                fieldnames = next(csv.reader(file), fieldnames)
+
+        with open(stat_file, "a", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=fieldnames, restval="", extrasaction="ignore")
+            if new:
+                writer.writeheader()
+            writer.writerow(row)
+
+
+    @staticmethod
+    def flat_record(record):
+        """ a statistic record with flat values, for csv
+            histo: '3|12 4|40 ..', phases: json
+        """
+        return record | {
+            "histo": " ".join(f'{k}|{v}' for k, v in record["histo"].items()),
+            "phases": json.dumps(record["phases"]),
+        }
+
+
     # ==========================================================
@@ -4,6 +4,8 @@ from pathlib import Path
 import string
 
 from .mami_lang import EN, GER, FRA                 # Language Package
+from .mami_cache import LruCache
+from .mami_tools import PhaseTimer
 
 
 class Init:
@@ -23,15 +25,33 @@ class Init:
     autosolver = False   # the code breaker, automatic
     show_hint  = True    # give a hint in manual solver mode
     statistic  = False   # a special mode to determine avg of guesses
-    algo       = 1       # solver algorithm: Random:1, Knuth:2, Kooi:3, Irving:4
+    algo       = 1       # solver algorithm: Random:1, Knuth:2, Kooi:3, Irving:4, Entropy:5, Genetic:6
     algo_all   = True    # all algoritm in statistic mode
     stat_runs  = 100     # runs for statistic mode
+    stat_exact = False   # statistic over all secrets once, instead of 'stat_runs' random secrets
+    workers    = 1       # worker processes in statistic mode, 1: without process pool
+    seed       = None    # random seed of a statistic run, None: not reproducible
 
     stat_store = False   # save statistic results to file (automatic from 5000 runs)
+    stat_format = "jsonl"  # structured records beside the stats log: "jsonl", "csv", "": none
     tor_help   = True    # use the tor_helper file // Table_Of_Responses
+    tree_store = False   # save the decision trees of the solver algorithms to file
+    opening_book = True  # first and second guesses of the deterministic solvers, computed once, stored
+    symmetry   = True    # solvers score only one guess per symmetry class
+    profile    = False   # per-phase and per-turn timers in statistic mode
+    worker_tor = True    # without TOR file: the workers share one response matrix in memory
+    sample_budget = 0    # max. candidate x pool evaluations per turn of the solvers, 0: exact
+    sample_pool = True   # sample the pool as well, not only the candidates
+    sample_strat = True  # stratified candidate sample over the ranks, otherwise random
+    ga_population = 150  # codes per generation of the genetic solver
+    ga_generations = 100 # max. generations per turn of the genetic solver
+    cache_size = 64      # memory budget of the response cache, MB
 
     STAT_FILE  = "mami_stat"  # name of stored statistic file (w/o .extension ".log")
-    TOR_NAME   = "tor"        # name of loaded/stored TOR file (w/o .extension ".bz2")
+    TOR_NAME   = "tor"        # name of loaded/stored TOR file (w/o setup and .extension ".npy")
+    TREE_NAME  = "tree"       # name of decision tree file (w/o setup and .extension ".pkl")
+    BOOK_NAME  = "book"       # name of opening book file (w/o setup and .extension ".pkl")
+    BENCH_FILE = "mami_bench" # name of the benchmark baseline file (w/o .extension ".json")
 
     STAT_DIR   = ""           # SubDir to statistic file
     TOR_DIR    = "include"    # SubDir to TOR file
@@ -43,9 +63,25 @@ class Init:
     # generally used variables/values/properties
 
     MAX_VARIANTS = 10**7    # cut the range of char/col combinations
+    MAX_GENETIC  = 10**12   # the same, only the genetic solver without variant pool
     MAX_RUN1     = 100_000  # limit the statistic runs
     MAX_RUN2     = 10_000   # algo > 1 are time-consuming
+    MAX_TOR      = 16_384   # max. variants for a TOR file, variants**2 bytes
+    MAX_BOOK     = 100_000  # max. variants for an opening book, all second turns are scored once
+    MAX_SYMMETRY = 720      # max. column orderings for the symmetry classes
+    SYMMETRY_POOL = 64      # min. pool size for the symmetry classes
+    PRUNE_WORK   = 2**20    # min. candidates x pool for the branch and bound of Knuth
+    PRUNE_SLICES = 8        # pool slices of the branch and bound
+    PRUNE_BLOCKS = 4        # candidate blocks of the branch and bound, the bound is updated after each
+    MAX_BUDGET   = 10**9    # max. sample budget per turn
+    TREE_COMPACT = 0.5      # compact a tree file above this share of nodes in its delta log
     STORE_STAT   = 5_000    # runs from which the statistic results are automatically saved to file
+    GA_ELIGIBLE  = 60       # eligible codes (consistent with all feedbacks) to end the evolution
+    GA_EXTRA     = 10       # max. generations without any eligible code, times 'ga_generations'
+    GA_STALL     = 10       # generations without a new eligible code to end the evolution
+    GA_MUTATION  = 0.03     # chance of a random color at a random column
+    GA_PERMUTATION = 0.03   # chance of two swapped columns
+    GA_INVERSION = 0.02     # chance of reversed columns between two points
 
     LANG_DICT    = {1: EN, 2: GER, 3: FRA}  # available language packages
     LETTERS      = string.ascii_uppercase
@@ -57,20 +93,39 @@ class Init:
         2 : "Knuth",
         3 : "Kooi",
         4 : "Irving",
+        5 : "Entropy",
+        6 : "Genetic",
     }
+    ALGO_TREE = {2, 3, 4, 5}    # deterministic solver modes, with decision tree
+    ALGO_NOPOOL = {6}           # solver modes without variant pool, up to MAX_GENETIC variants
 
     prev_guesses = []    # contains all previous guesses
+    prev_answers = []    # contains all previous encoded feedbacks, the path in the decision tree
     error_ct   = 0       # for show input error
     char_set   = []      # [0,1,2,..] will be set later on 'check_setup'
     lang       = {}      # working language dictionary
     len_vari   = 0       # number of variants
+    allvariants = []     # all variants of the current setup, a VariantSpace (rank <-> string)
+    vari_key   = ()      # setup of the generated variants (char_set, columns, repetition)
     secret     = ""      # single code
     code_pool  = []      # all generated secrets
-    tor        = {}      # feedback dict: Table_Of_Responses
-    tor_imp    = {}      # imported TOR
+    cache      = LruCache(cache_size * 2**20)  # feedback cache: {(guess, code): encoded response}
+    tor_imp    = None    # imported TOR, response matrix (variants x variants)
     tor_loaded = False   # TOR file is loaded
+    tor_key    = ()      # setup of the loaded TOR (char, columns, repetition)
     tor_loaded_len = 0   # number of loaded responses from file
-    thread     = False   # statistic run in multi-thread/processor mode // bad realisation :-(
+    tor_thread = None    # background load of a TOR shard: (tor_key, thread, [memory map])
+    tor_shared = None    # shared response matrix of the workers: (block name, shape, dtype)
+    tor_block  = None    # its shared memory block, kept open while attached
+    trees      = {}      # decision trees: {(char, columns, repetition, algo, sample): {path: guess}}
+    trees_saved = {}     # number of loaded/stored nodes per decision tree
+    trees_delta = {}     # number of nodes in the delta log per decision tree
+    tree_hits  = 0       # guesses found in a decision tree, w/o scoring
+    tree_misses = 0      # guesses scored and added to a decision tree
+    timer      = PhaseTimer()  # phase timers: {(phase, turn): [calls, sec]}
+    stat_date  = ""      # start of the current statistic run, the run id of its records
+    sample_ref = None    # average steps of the exact solver on the same secrets, beside a sampled run
+    ga_pop     = None    # population of the genetic solver, from turn to turn of a game
 
     fb_alternat = False  #  Feedb Variant with more counts but slowier
     fb_calls  = 0        # fb_call
@@ -0,0 +1,196 @@
+""" Feedback Kernel
+    vectorized scoring of integer-encoded codes
+"""
+from itertools import product, permutations
+from math import prod, factorial
+
+import numpy as np
+
+
+class Kernel:
+    """
+    encode
+    decode
+    color_counts
+    feedback
+    feedback_matrix
+    dtype
+    response
+    pins
+    histogram
+    canonical
+    """
+
+    CHUNK = 2**22   # max. elements of a temporary (guesses x codes) array
+
+    @staticmethod
+    def encode(seqs, char_set):
+        """ code strings -> integer array (codes x columns)
+            every character is replaced by its index in 'char_set'
+            ['1122', '1123'] -> [[0,0,1,1], [0,0,1,2]]
+        """
+        index = {char: i for i, char in enumerate(char_set)}
+        columns = len(seqs[0]) if len(seqs) else 0
+        codes = np.fromiter(
+            (index[char] for seq in seqs for char in seq),
+            dtype=np.uint8, count=len(seqs) * columns)
+        return codes.reshape(len(seqs), columns)
+
+
+    @staticmethod
+    def decode(codes, char_set):
+        """ integer array (codes x columns) -> code strings
+        """
+        return ["".join(char_set[i] for i in code) for code in codes]
+
+
+    @staticmethod
+    def color_counts(codes, char):
+        """ histogram of the characters of each code
+            array (codes x char)
+            [[0,0,1,1]] -> [[2,2,0,0,0,0]]
+        """
+        counts = np.zeros((len(codes), char), dtype=np.uint8)
+        for color in range(char):
+            counts[:, color] = (codes == color).sum(axis=1)
+        return counts
+
+
+    @staticmethod
+    def feedback(guess, codes, char):
+        """ tests one 'guess' (columns) for all 'codes' (codes x columns)
+            returns the arrays (black, white)
+        """
+        black, white = Kernel.feedback_matrix(guess[np.newaxis], codes, char)
+        return black[0], white[0]
+
+
+    @staticmethod
+    def feedback_matrix(guesses, codes, char, count_g=None, count_c=None):
+        """ tests all 'guesses' (guesses x columns) for all 'codes' (codes x columns)
+            black pin: char and position are correct
+            white pin: char is correct, position is wrong
+            count_g, count_c: their color counts, if already known
+            returns the arrays (black, white), each (guesses x codes)
+        """
+        len_g, len_c = len(guesses), len(codes)
+        black = np.zeros((len_g, len_c), dtype=np.uint8)
+        white = np.zeros((len_g, len_c), dtype=np.uint8)
+
+        if count_g is None:
+            count_g = Kernel.color_counts(guesses, char)
+        if count_c is None:
+            count_c = Kernel.color_counts(codes, char)
+
+        # splits the guesses into parts of (part x codes)
+        part = max(1, Kernel.CHUNK // max(1, len_c))
+
+        for i in range(0, len_g, part):
+            j = min(i + part, len_g)
+
+            # same char at the same position, column by column
+            for col in range(guesses.shape[1]):
+                black[i:j] += guesses[i:j, col, np.newaxis] == codes[np.newaxis, :, col]
+
+            # sum of the smallest match of both histograms, color by color
+            for color in range(char):
+                white[i:j] += np.minimum(
+                    count_g[i:j, color, np.newaxis], count_c[np.newaxis, :, color])
+
+            # avoid double counting of white (even if black)
+            white[i:j] -= black[i:j]
+
+        return black, white
+
+
+    @staticmethod
+    def dtype(columns):
+        """ smallest unsigned type for an encoded response
+            a single byte up to 15 columns
+        """
+        return np.uint8 if (columns + 1) ** 2 <= 256 else np.uint16
+
+
+    @staticmethod
+    def response(black, white, columns):
+        """ (black, white) -> a single integer, black * (columns+1) + white
+            works on integers and arrays
+        """
+        if isinstance(black, np.ndarray):
+            black = black.astype(Kernel.dtype(columns))
+        return black * (columns + 1) + white
+
+
+    @staticmethod
+    def pins(resp, columns):
+        """ encoded response -> (black, white)
+        """
+        return divmod(int(resp), columns + 1)
+
+
+    @staticmethod
+    def histogram(responses, columns):
+        """ counts the encoded responses of each row
+            (guesses x codes) -> (guesses x (columns+1)**2)
+        """
+        size = (columns + 1) ** 2
+        rows = len(responses)
+        offset = np.arange(rows, dtype=np.int64)[:, np.newaxis] * size
+        counts = np.bincount((responses + offset).ravel(), minlength=rows * size)
+        return counts.reshape(rows, size)
+
+
+    @staticmethod
+    def canonical(codes, guesses, char, max_perms=720):
+        """ symmetry class of each code, given the previous 'guesses':
+            - colors not in any guess are interchangeable (free colors)
+            - columns with the same color in every guess are interchangeable
+            codes of the same class have the same feedback partition of a pool
+            consistent with the guesses
+            returns a class key per code, the smallest image under both symmetries
+        """
+        len_c, columns = codes.shape
+        guesses = np.asarray(guesses, dtype=np.uint8).reshape(-1, columns)
+
+        # free colors, relabeled in the order of their first appearance
+        free = np.ones(char, dtype=bool)
+        free[guesses.ravel()] = False
+        free_colors = np.flatnonzero(free).astype(np.uint8)
+
+        # groups of interchangeable columns, all their orderings
+        groups = {}
+        for col in range(columns):
+            groups.setdefault(tuple(guesses[:, col]), []).append(col)
+        groups = list(groups.values())
+        perms = [list(range(columns))]
+        if prod(factorial(len(group)) for group in groups) <= max_perms:
+            perms = []
+            for orders in product(*(permutations(group) for group in groups)):
+                perm = list(range(columns))
+                for group, order in zip(groups, orders):
+                    for col, new in zip(group, order):
+                        perm[col] = new
+                perms.append(perm)
+
+        weight = char ** np.arange(columns - 1, -1, -1, dtype=np.int64)
+        rows = np.arange(len_c)
+        keys = None
+        for perm in perms:
+            image = codes[:, perm]
+            label = np.full((len_c, char), -1, dtype=np.int16)
+            used = np.zeros(len_c, dtype=np.int64)
+
+            for col in range(columns):
+                color = image[:, col]
+                new = free[color] & (label[rows, color] < 0)
+                label[rows[new], color[new]] = free_colors[used[new]]
+                used += new
+                image[:, col] = np.where(free[color], label[rows, color], color)
+
+            key = image.astype(np.int64) @ weight
+            keys = key if keys is None else np.minimum(keys, key)
+
+        return keys
+
+
+# ==========================================================
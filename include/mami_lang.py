@@ -19,6 +19,11 @@ EN = {
     'stat':     "Statistic_run",
     'file':     "file_load",
     'runs':     "Runs",
+    'exact':    "Exact_all_codes",
+    'sample':   "Sample_budget",
+    'profile':  "Phase_timers",
+    'ga_pop':   "GA_population",
+    'ga_gen':   "GA_generations",
     'solu':     "Solutions",
     'feedb':    "Answer_combinat.",
 
@@ -28,6 +33,7 @@ EN = {
     'only1':    "Only digits possible from",
     'only2':    "Input: 0/1/n/y",
     'loading':  "are loading",
+    'generating': "are generating",
     'storing':  "are storing",
     'done':     "done",
     'nfound':   "not founded",
@@ -45,10 +51,10 @@ EN = {
 LANG_ALL = {
     'lang2':    "en:1 de:2 fr:3",   # must be extend on new language
     'alg_A':    "Rand:1 Knut:2",
-    'alg_B':    "Kooi:3 Irvi:4",
+    'alg_B':    "Kooi:3 Irvi:4 Entr:5 Gene:6",
     'algo_all': "Algo_all",
     'secret':   "code",
-    'thread':   "Thread_mode",
+    'workers':  "Worker_processes",
     'yes':      [],
     'no':       [],
 }
@@ -74,6 +80,11 @@ GER = {
     'stat':     "Statistik_Modus",
     'file':     "Datei_laden",
     'runs':     "Durchläufe",
+    'exact':    "Exakt_alle_Kodes",
+    'sample':   "Stichprobe_Budget",
+    'profile':  "Phasen_Zeiten",
+    'ga_pop':   "GA_Population",
+    'ga_gen':   "GA_Generationen",
     'solu':     "Lösungen",
     'feedb':    "Kombinationen_max",
 
@@ -83,6 +94,7 @@ GER = {
     'only1':    "Nur Ziffern möglich von",
     'only2':    "Eingabe: 0/1/n/j",
     'loading':  "wird geladen",
+    'generating': "wird erzeugt",
     'storing':  "wird gespeichert",
     'done':     "fertig",
     'nfound':   "nicht gefunden",
@@ -115,6 +127,11 @@ FRA = {
     'stat':     "Mode_statistique",
     'file':     "fichier_charg.",
     'runs':     "Passages",
+    'exact':    "Exact_tous_codes",
+    'sample':   "Budget_échantillon",
+    'profile':  "Chrono_phases",
+    'ga_pop':   "GA_population",
+    'ga_gen':   "GA_générations",
     'solu':     "Solutions",
     'feedb':    "Combinaisons_max",
 
@@ -124,6 +141,7 @@ FRA = {
     'only1':    "Chiffres seulement possibles de",
     'only2':    "Entrée:  0/1/n/o",
     'loading':  "est chargé",
+    'generating': "est généré",
     'storing':  "est enregistré",
     'done':     "terminé",
     'nfound':   "non trouvé",
@@ -1,11 +1,15 @@
 """ Setup Maker
     input, output, data check
 """
+import os
 from statistics import median, multimode
 from math import log, factorial as fact
 from collections import Counter
 
+import numpy as np
+
 from .mami_file import File
+from .mami_kernel import Kernel
 from .mami_tools import ColorList as fg   # ColorSet
 from .mami_tools import ToolBox as tb           # TimeConverter
 
@@ -22,6 +26,8 @@ class Setup(File):
     check_setup
     max_char
     max_col
+    max_variants
+    runs
     len_variants
     input_seq
     input_int
@@ -62,9 +68,18 @@ class Setup(File):
 
             msg_setup += (
                 f'{"TOR_"+lang['file']:18}: {cls.tor_help}\n'
-                f'{lang['runs'].capitalize():18}: {cls.stat_runs:,}\n'
+                f'{lang['exact']:18}: {cls.stat_exact}\n'
+                f'{lang['runs'].capitalize():18}: {cls.runs():,}\n'
+                f'{lang['workers']:18}: {cls.workers}\n'
+                f'{lang['sample']:18}: {cls.sample_budget:,d}\n'
+                f'{lang['profile']:18}: {cls.profile}\n'
             )
-            #msg_setup += (f'{lang['thread']:18}: {cls.thread}\n')
+
+            if cls.algo_all or cls.algo in cls.ALGO_NOPOOL:
+                msg_setup += (
+                    f'{lang['ga_pop']:18}: {cls.ga_population:,d}\n'
+                    f'{lang['ga_gen']:18}: {cls.ga_generations:,d}\n'
+                )
 
         msg_setup += (
             f'{lang['solu'].capitalize():18}: {cls.len_variants():,d}\n'
@@ -156,7 +171,7 @@ class Setup(File):
                 print(f'# {lang['alg_A']}')
                 msg = (f'  {lang['alg_B']+" ":.<19}{fg.grey}'
                        f'{" <"+str(cls.algo)+">":8}{fg.off}: ')
-                x = cls.input_int(msg, min_in=0, max_in=5)
+                x = cls.input_int(msg, min_in=0, max_in=len(cls.ALGO_SET))
                 cls.algo = x if x != "" else cls.algo
 
             msg = (f'# {"TOR_"+lang['file']+" ":.<19}{fg.grey}'
@@ -164,23 +179,53 @@ class Setup(File):
             x = cls.input_bool(msg)
             cls.tor_help = x if x != "" else cls.tor_help
 
-            _run = f'{cls.stat_runs:,d}'
-            runs = f'{" <" + _run + ">":8}'
-            if len(runs) > 8:    # change the format above 10,000
-                runs = f'{" " + runs:8}'
+            msg = (f'# {lang['exact']+" ":.<19}{fg.grey}'
+                   f'{" ["+str(cls.stat_exact)+"]":8}{fg.off}: ')
+            x = cls.input_bool(msg)
+            cls.stat_exact = x if x != "" else cls.stat_exact
+
+            # exact: every secret once, no runs
+            if not cls.stat_exact:
+                _run = f'{cls.stat_runs:,d}'
+                runs = f'{" <" + _run + ">":8}'
+                if len(runs) > 8:    # change the format above 10,000
+                    runs = f'{" " + runs:8}'
+
+                if cls.algo_all and cls.stat_runs > max_run2:
+                    msg = f'# {lang['runs'].capitalize()+" ":.<19}{fg.grey}{runs}{fg.off}: '
+                    x = cls.input_int(msg, max_in=max_run2)
+                else:
+                    msg = f'# {lang['runs'].capitalize()+" ":.<19}{fg.grey}{runs}{fg.off}: '
+                    x = cls.input_int(msg, max_in=max_run1)
+                cls.stat_runs = x if x != "" else cls.stat_runs
+
+            msg = (f'# {lang['workers']+" ":.<19}{fg.grey}'
+                   f'{" <"+str(cls.workers)+">":8}{fg.off}: ')
+            x = cls.input_int(msg, max_in=os.cpu_count() or 1)
+            cls.workers = x if x != "" else cls.workers
+
+            # 0: exact solvers
+            msg = (f'# {lang['sample']+" ":.<19}{fg.grey}'
+                   f'{" <"+str(cls.sample_budget)+">":8}{fg.off}: ')
+            x = cls.input_int(msg, min_in=0, max_in=cls.MAX_BUDGET)
+            cls.sample_budget = x if x != "" else cls.sample_budget
+
+            msg = (f'# {lang['profile']+" ":.<19}{fg.grey}'
+                   f'{" ["+str(cls.profile)+"]":8}{fg.off}: ')
+            x = cls.input_bool(msg)
+            cls.profile = x if x != "" else cls.profile
 
-            if cls.algo_all and cls.stat_runs > max_run2:
-                msg = f'# {lang['runs'].capitalize()+" ":.<19}{fg.grey}{runs}{fg.off}: '
-                x = cls.input_int(msg, max_in=max_run2)
-            else:
-                msg = f'# {lang['runs'].capitalize()+" ":.<19}{fg.grey}{runs}{fg.off}: '
-                x = cls.input_int(msg, max_in=max_run1)
-            cls.stat_runs = x if x != "" else cls.stat_runs
+            # genetic solver
+            if cls.algo_all or cls.algo in cls.ALGO_NOPOOL:
+                msg = (f'# {lang['ga_pop']+" ":.<19}{fg.grey}'
+                       f'{" <"+str(cls.ga_population)+">":8}{fg.off}: ')
+                x = cls.input_int(msg, min_in=2, max_in=10_000)
+                cls.ga_population = x if x != "" else cls.ga_population
 
-            #msg = (f'(15) {lang['thread']+" ":.<19}{fg.grey}'
-            #       f'{" ["+str(cls.thread)+"]":8}{fg.off}: ')
-            #x = input_bool(msg)
-            #cls.thread = x if x != "" else cls.thread
+                msg = (f'# {lang['ga_gen']+" ":.<19}{fg.grey}'
+                       f'{" <"+str(cls.ga_generations)+">":8}{fg.off}: ')
+                x = cls.input_int(msg, max_in=10_000)
+                cls.ga_generations = x if x != "" else cls.ga_generations
 
         print(f'# {lang['solu'].capitalize():27}: {cls.len_variants():,d}')
         #print(f'{lang['feedb'].capitalize():27}: {cls.len_variants()**2:,d}')
@@ -189,6 +234,13 @@ class Setup(File):
         cls.lang = lang
         cls.check_setup()
 
+        # another setup, the TOR shard of the old one is released
+        if cls.tor_loaded and cls.tor_key != cls.tor_shard():
+            cls.release_tor()
+
+        # the final setup is known, the TOR is loaded while waiting for the start
+        cls.prefetch_tor()
+
         # run the game after press a button
         msg = "[ Start ] <--| "
         print('\33[2A')                     # cursor: 2up, and 1down for print() = 1up
@@ -203,9 +255,12 @@ class Setup(File):
     @classmethod
     def show_guess(cls, step, guess, new_variants, result, old_variants):
         """ show the guess & feedback
+            result: encoded response, decoded only here
+            new_variants, old_variants: pool masks over all solutions
         """
-        black, white = result
-        len_vari = len(new_variants)
+        black, white = Kernel.pins(result, cls.columns)
+        # without variant pool (genetic solver) no size
+        len_vari = int(new_variants.sum()) if new_variants is not None else None
         msg_feedb = f'-> {cls.lang['black'][0]}:{black} {cls.lang['white'][0]}:{white}'
         msg = msg_guess = msg_vari = msg_end = step_right = step_up = ""
 
@@ -214,7 +269,7 @@ class Setup(File):
 
         else:
             step_up = "\033[1A"   # 1x
-            if guess in old_variants:
+            if old_variants[cls.allvariants.rank(guess)]:
                 step_right = f'\033[{6 + cls.columns + 1}C'
 
             # The guess is not in the reducing variants
@@ -222,13 +277,13 @@ class Setup(File):
             else:
                 msg_guess = f'?_{step:02}: {fg.red}{guess}{fg.off} '
 
-        tmp1 = f'{len_vari:,}:'
+        tmp1 = f'{len_vari:,}:' if len_vari is not None else "-:"
 
         if cls.show_hint and cls.algo == 1:
             tmp2 = f' | {tmp1:<5} '
-            tmp3 = str(new_variants)
+            tmp3 = str(cls.pool_variants(new_variants, 3))
             if len_vari > 3:     # too many variants to show, only 3
-                tmp3 = str(new_variants[:3]) + "\033[1D" + ", ...]"
+                tmp3 = tmp3 + "\033[1D" + ", ...]"
             msg_vari = tmp2 + tmp3
         else:
             msg_vari = f' | {tmp1[:-1]:<5} '
@@ -283,12 +338,15 @@ class Setup(File):
         avg2 = sum(duration)/len(duration)
         med1 = median(guesses)               # zentraler Wert / the average value
         med2 = median(duration)
+        p90, p99 = np.percentile(duration, [90, 99])
         mod1 = multimode(guesses)            # häufigste Werte / the most common values
         #mod0 = mode(guesses)                # Modus:häufigster Wert / the most frequent value
         msg_fb = ""
 
         avg2 = f'{avg2:,.0f}' if avg2>100 else f'{avg2:,.1f}'
         med2 = f'{med2:,.0f}' if med2>100 else f'{med2:,.1f}'
+        p90 = f'{p90:,.0f}' if p90>100 else f'{p90:,.1f}'
+        p99 = f'{p99:,.0f}' if p99>100 else f'{p99:,.1f}'
 
         histo = list(Counter(guesses).items())
         histo = sorted(histo, key=lambda x: x[0], reverse=False)
@@ -315,6 +373,8 @@ class Setup(File):
             f'{"min.":10}: {min(guesses)}\n'
             f'{fg.cyan}{"avg. msec":10}: {avg2}{fg.off}\n'
             f'{"med. msec":10}: {med2}\n'
+            f'{"p90 msec":10}: {p90}\n'
+            f'{"p99 msec":10}: {p99}\n'
             #f'{"max. msec":10}: {max(duration):,.1f}\n'
             #f'{"min. msec":10}: {min(duration):,.1f}\n'
             #f'{"max.":10}: {change_time_to_string(max(duration)/1000)}\n'
@@ -330,12 +390,35 @@ class Setup(File):
                 #f'{"fb.used":10}: {cls.fb_used:,d}\n'
                 f'{"fb.loaded":10}: {cls.tor_loaded_len:,d}\n'
             )
+        msg_cache = (
+            f'{"cache hit":10}: {cls.cache.hits:,d}\n'
+            f'{"cache miss":10}: {cls.cache.misses:,d}\n'
+            f'{"cache evic":10}: {cls.cache.evictions:,d}\n'
+            f'{"cache MB":10}: {cls.cache.nbytes / 2**20:,.1f}\n'
+        )
+        lookups = cls.tree_hits + cls.tree_misses
+        if lookups:
+            msg_cache += (
+                f'{"tree hit":10}: {cls.tree_hits:,d}\n'
+                f'{"tree miss":10}: {cls.tree_misses:,d}\n'
+                f'{"tree hit %":10}: {cls.tree_hits / lookups * 100:.1f}\n'
+            )
+        msg_sample = ""
+        if cls.sample_ref:
+            loss = (avg1 - cls.sample_ref) / cls.sample_ref * 100
+            msg_sample = (
+                f'{"exact avg.":10}: {cls.sample_ref:.3f}\n'
+                f'{"loss %":10}: {loss:+.2f}\n'
+            )
+        msg_timer = ""
+        if cls.profile:
+            msg_timer = f'{"-" * 26}\n' + cls.timer.report(len(guesses))
         msg_end = (
             f'{"-" * 26}\n'
             #f'{"alltime sec":10}: {alltime:,.1f}\n\n'
             f'{"alltime":10}: {alltime1}\n\n'
         )
-        msg += msg_fb + msg_end
+        msg += msg_fb + msg_cache + msg_sample + msg_timer + msg_end
 
         print(msg, end="")
 
@@ -389,8 +472,10 @@ class Setup(File):
     # ==========================================================
 
     @classmethod
-    def check_setup(cls):
+    def check_setup(cls, resolved=False):
         """ check the dependencies
+            resolved: char and columns are already checked (worker snapshot),
+            they are not cut again
         """
         # set language // union two dict (prio: the last)
         cls.lang = cls.LANG_DICT[1] | cls.LANG_DICT[cls.language]
@@ -405,15 +490,6 @@ class Setup(File):
         if not cls.repetition and (cls.columns > cls.char):
             cls.columns = cls.char
 
-        # makes a set of characters
-        if cls.numbers:
-            cls.char_set = list(cls.DIGITS[:cls.char])  # cuts the string from the left
-        else:
-            cls.char_set = list(cls.LETTERS[:cls.char])
-            #cls.dic_ld = dict(zip(cls.LETTERS, [ord(x) for x in cls.LETTERS]))
-            #cls.dic_dl = {v: k for k, v in cls.dic_ld.items()}
-            #cls.char_set = list(cls.dic_dl.keys())[:cls.char]
-
         # in statistic option no manual mode
         #if cls.statistic:
         #    cls.autocoder = True
@@ -427,17 +503,46 @@ class Setup(File):
         if not cls.statistic and not cls.autosolver:
             cls.algo = 1
 
+        # exact statistic only up to the max. runs
+        if cls.stat_exact and cls.len_variants() > cls.MAX_RUN1:
+            cls.stat_exact = False
+
         # always save statistic
-        if cls.statistic and cls.stat_runs >= cls.STORE_STAT:
+        if cls.statistic and cls.runs() >= cls.STORE_STAT:
             cls.stat_store = True
 
+        # sample budget of the solvers, 0: exact
+        cls.sample_budget = max(0, min(cls.sample_budget, cls.MAX_BUDGET))
+
+        # genetic solver, at least two parents and one generation
+        cls.ga_population = max(2, cls.ga_population)
+        cls.ga_generations = max(1, cls.ga_generations)
+
+        # response cache, at least one MB, resized to a new budget
+        cls.cache_size = max(1, cls.cache_size)
+        if cls.cache.budget != cls.cache_size * 2**20:
+            cls.cache.resize(cls.cache_size * 2**20)
+
+        # worker processes, not more than cpu cores
+        cls.workers = max(1, min(cls.workers, os.cpu_count() or 1))
+
         # game mode without TOR helper file
         if not cls.statistic:
             cls.tor_help = False
 
         # cut the complexity and set char/col down
-        cls.char = cls.max_char(cls.char)
-        cls.columns = cls.max_col(cls.columns)
+        if not resolved:
+            cls.char = cls.max_char(cls.char)
+            cls.columns = cls.max_col(cls.columns)
+
+        # makes a set of characters, after the cut
+        if cls.numbers:
+            cls.char_set = list(cls.DIGITS[:cls.char])  # cuts the string from the left
+        else:
+            cls.char_set = list(cls.LETTERS[:cls.char])
+            #cls.dic_ld = dict(zip(cls.LETTERS, [ord(x) for x in cls.LETTERS]))
+            #cls.dic_dl = {v: k for k, v in cls.dic_ld.items()}
+            #cls.char_set = list(cls.dic_dl.keys())[:cls.char]
 
 
     @classmethod
@@ -446,15 +551,16 @@ class Setup(File):
             (1): var=char**col .. char=var**1/col .. col=log(var,char)=log(var)/log(char)
             (2): var=char!//(char-col)! .. no inverse function exist
         """
+        max_variants = cls.max_variants()
         if cls.repetition:
             variants = char ** cls.columns
-            if variants > cls.MAX_VARIANTS:
-                char = int(cls.MAX_VARIANTS**(1/float(cls.columns)))
+            if variants > max_variants:
+                char = int(max_variants**(1/float(cls.columns)))
             return char
 
         else:
             variants = fact(char) // fact(char - cls.columns)
-            while variants > cls.MAX_VARIANTS:
+            while variants > max_variants:
                 char -= 1
                 variants = fact(char) // fact(char - cls.columns)
             return char
@@ -465,20 +571,39 @@ class Setup(File):
         """ cut the complexity and set char down
             var=char**col .. char=var**1/col .. col=log(var,char)=log(var)/log(char)
         """
+        max_variants = cls.max_variants()
         if cls.repetition:
             variants = cls.char ** col
-            if variants > cls.MAX_VARIANTS:
-                col = int(log(cls.MAX_VARIANTS, cls.char))
+            if variants > max_variants:
+                col = int(log(max_variants, cls.char))
             return col
 
         else:
             variants = fact(cls.char) // fact(cls.char - col)
-            while variants > cls.MAX_VARIANTS:
+            while variants > max_variants:
                 col -= 1
                 variants = fact(cls.char) // fact(cls.char - col)
             return col
 
 
+    @classmethod
+    def max_variants(cls):
+        """ the limit of the char/col combinations,
+            higher if only a solver without variant pool plays (genetic)
+        """
+        if cls.algo in cls.ALGO_NOPOOL and not (cls.statistic and cls.algo_all):
+            return cls.MAX_GENETIC
+        return cls.MAX_VARIANTS
+
+
+    @classmethod
+    def runs(cls):
+        """ number of games in statistic mode,
+            exact: all variants once
+        """
+        return cls.len_variants() if cls.stat_exact else cls.stat_runs
+
+
     @classmethod
     def len_variants(cls):
         """ returns the theoretical lenght of all variants
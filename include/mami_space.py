@@ -0,0 +1,177 @@
+""" Variant Space
+    all variants of a setup, indexed by rank, without materializing them
+"""
+from math import perm
+
+import numpy as np
+
+from .mami_kernel import Kernel
+
+
+class VariantSpace:
+    """ all variants from 'char_set' with the number of 'columns',
+        in the order of itertools.product / itertools.permutations
+        len, rank, unrank, codes, counts, histogram, common, [i], [i:j], iteration
+    """
+    KEEP  = 2**21   # max. variants to keep the integer-encoded codes in memory
+    CHUNK = 2**16   # variants per part on iteration
+
+    def __init__(self, char_set, columns, repetition):
+        self.char_set   = list(char_set)
+        self.char       = len(char_set)
+        self.columns    = columns
+        self.repetition = repetition
+        self.index      = {char: i for i, char in enumerate(self.char_set)}
+        self._codes     = None
+        self._counts    = None  # color counts of all variants (variants x char)
+        self._histo     = {}    # variant string -> {char: count}
+
+        # place values of the columns
+        # w/  repetition: char**(columns-1-col)
+        # w/o repetition: number of orderings of the remaining columns
+        char = self.char
+        if repetition:
+            self.weight = [char ** (columns - 1 - col) for col in range(columns)]
+            self.size = char ** columns
+        else:
+            self.weight = [perm(char - 1 - col, columns - 1 - col) for col in range(columns)]
+            self.size = perm(char, columns)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, key):
+        """ [i] -> variant string, [i:j] -> list of variant strings
+        """
+        if isinstance(key, slice):
+            return self.decode(self.codes(np.arange(*key.indices(self.size))))
+        return self.unrank(key)
+
+    def __iter__(self):
+        for start in range(0, self.size, self.CHUNK):
+            stop = min(start + self.CHUNK, self.size)
+            yield from self.decode(self.codes(np.arange(start, stop)))
+
+    def __contains__(self, code):
+        if len(code) != self.columns:
+            return False
+        try:
+            self.rank(code)
+        except (KeyError, ValueError):
+            return False
+        return True
+
+    def rank(self, code):
+        """ variant string -> index in the space
+        """
+        digits = [self.index[char] for char in code]
+        if self.repetition:
+            return sum(digit * weight for digit, weight in zip(digits, self.weight))
+
+        # w/o repetition: position of the character among the unused ones
+        rank = 0
+        for col, digit in enumerate(digits):
+            smaller = sum(1 for prev in digits[:col] if prev < digit)
+            if digit in digits[:col]:
+                raise ValueError(f'repetition in {code}')
+            rank += (digit - smaller) * self.weight[col]
+        return rank
+
+    def unrank(self, rank):
+        """ index in the space -> variant string
+        """
+        rank = int(rank)
+        if not 0 <= rank < self.size:
+            raise IndexError(rank)
+
+        char_set = self.char_set
+        if self.repetition:
+            return "".join(char_set[rank // weight % self.char] for weight in self.weight)
+
+        unused = list(range(self.char))
+        code = []
+        for weight in self.weight:
+            digit, rank = divmod(rank, weight)
+            code.append(char_set[unused.pop(digit)])
+        return "".join(code)
+
+    def codes(self, ranks=None):
+        """ integer-encoded variants of 'ranks' (all on None)
+            array (ranks x columns), character index in 'char_set'
+        """
+        if self._codes is None and self.size <= self.KEEP:
+            self._codes = self.unrank_codes(np.arange(self.size))
+
+        if self._codes is not None:
+            return self._codes if ranks is None else self._codes[ranks]
+
+        if ranks is None:
+            ranks = np.arange(self.size)
+        return self.unrank_codes(ranks)
+
+    def counts(self, ranks=None):
+        """ color counts of the variants of 'ranks' (all on None)
+            array (ranks x char), kept in memory with the codes
+        """
+        if self._counts is None and self.size <= self.KEEP:
+            self._counts = Kernel.color_counts(self.codes(), self.char)
+
+        if self._counts is not None:
+            return self._counts if ranks is None else self._counts[ranks]
+
+        return Kernel.color_counts(self.codes(ranks), self.char)
+
+    def histogram(self, code):
+        """ color counts of a variant string, only of its characters
+            {char: count}, computed once per variant
+        """
+        histo = self._histo.get(code)
+        if histo is None:
+            if len(self._histo) >= self.KEEP:
+                self._histo.clear()
+            histo = self._histo[code] = {char: code.count(char) for char in set(code)}
+        return histo
+
+    def common(self, guess, code):
+        """ number of common characters of two variant strings,
+            the sum of the smaller count of each character (black + white pins)
+            a loop over the characters of 'guess', not over the whole char_set
+        """
+        other = self.histogram(code)
+        total = 0
+        for char, count in self.histogram(guess).items():
+            match = other.get(char)
+            if match:
+                total += count if count < match else match
+        return total
+
+    def unrank_codes(self, ranks):
+        """ vectorized unrank: ranks -> array (ranks x columns)
+        """
+        ranks = np.asarray(ranks, dtype=np.int64).reshape(-1)
+        codes = np.empty((len(ranks), self.columns), dtype=np.uint8)
+
+        if self.repetition:
+            for col, weight in enumerate(self.weight):
+                codes[:, col] = ranks // weight % self.char
+            return codes
+
+        # the digit-th unused character, per column
+        unused = np.ones((len(ranks), self.char), dtype=bool)
+        rows = np.arange(len(ranks))
+        rest = ranks.copy()
+        for col, weight in enumerate(self.weight):
+            digit, rest = np.divmod(rest, weight)
+            pick = np.argmax(np.cumsum(unused, axis=1) > digit[:, np.newaxis], axis=1)
+            codes[:, col] = pick
+            unused[rows, pick] = False
+        return codes
+
+    def decode(self, codes):
+        """ array (codes x columns) -> list of variant strings
+        """
+        char_set = self.char_set
+        return ["".join(char_set[i] for i in code) for code in codes]
+
+
+# ==========================================================
@@ -1,8 +1,16 @@
 """ Start Switcher
 """
+import io
 import time
+import random
+from datetime import datetime
+from itertools import islice
+from collections import Counter
+from statistics import median
 from concurrent import futures as fs
-#import multiprocessing as mp
+from contextlib import redirect_stdout
+
+import numpy as np
 
 from .mami_calc import Calculation
 from .mami_tools import ProgressBar
@@ -13,8 +21,23 @@ class Starter(Calculation):
     start_game
     start_statistic
     start_statistic_loop
+    exact_reference
+    stat_summary
+    play_codes
+    setup_snapshot
+    restore_setup
     """
 
+    # user setup, handed over to the worker processes
+    SETUP_KEYS = (
+        "language", "char", "columns", "limit", "repetition", "numbers",
+        "autocoder", "autosolver", "statistic", "algo", "algo_all", "stat_exact",
+        "tor_help", "fb_alternat", "tree_store", "opening_book", "symmetry",
+        "sample_budget", "sample_pool", "sample_strat", "seed", "profile",
+        "worker_tor", "tor_shared", "ga_population", "ga_generations", "cache_size",
+        "MY_PATH", "TOR_DIR", "TOR_NAME", "TREE_NAME", "BOOK_NAME",
+    )
+
     @classmethod
     def start_game(cls):
         """ starts statistic or single mode
@@ -26,48 +49,73 @@ class Starter(Calculation):
         else:
             cls.start_mastermind()
 
-        cls.save_tor_file()
+        cls.save_tree_files()
 
 
     @classmethod
-    def start_statistic(cls):
-        """ starts the statistic run for all algorithms
+    def start_statistic(cls, algos=None):
+        """ starts the statistic run for all algorithms (or 'algos')
+            returns a summary dict per algorithm
         """
+        cls.stat_date = datetime.now().isoformat(timespec="seconds")
         cls.store_stat_header_to_file()
 
-        # generate all secrets
-        cls.code_pool = [cls.gen_variant() for _ in range(cls.stat_runs)]
+        # reproducible secrets and random guesses
+        if cls.seed is not None:
+            random.seed(cls.seed)
+
+        # generate all secrets, or every secret once (exact)
+        if cls.stat_exact:
+            cls.code_pool = list(cls.gen_allvariants())
+        else:
+            cls.code_pool = [cls.gen_variant() for _ in range(cls.stat_runs)]
 
-        algo_set = cls.ALGO_SET if cls.algo_all else [cls.algo]
+        algo_set = algos or (cls.ALGO_SET if cls.algo_all else [cls.algo])
+
+        # one process pool for all algorithms
+        # every worker gets a snapshot of the setup
+        # and the response matrix, built once in shared memory (without TOR file)
+        executor = block = None
+        if cls.workers > 1:
+            block = cls.share_tor()
+            executor = fs.ProcessPoolExecutor(
+                max_workers=cls.workers,
+                initializer=_init_worker,
+                initargs=(cls.setup_snapshot(),))
 
         temp = cls.algo
-        for algo in algo_set:
-            cls.algo = algo         # for later use in calculation and output
-            cls.start_statistic_loop(algo)
+        results = []
+        try:
+            for algo in algo_set:
+                cls.algo = algo         # for later use in calculation and output
+                results.append(cls.start_statistic_loop(algo, executor))
+        finally:
+            if executor:
+                executor.shutdown()
+            if block:
+                cls.tor_shared = None
+                block.close()
+                block.unlink()
         cls.algo = temp
 
+        return results
+
 
     @classmethod
-    def start_statistic_loop(cls, algo):
+    def start_statistic_loop(cls, algo, executor=None):
         """ starts the statistic run for selected algorithm
+            returns its summary dict
         """
         print(f'{"*" * 26}')
         print(f'{"algo":10}: {cls.ALGO_SET[algo]} ({algo})')
 
-        repeats = cls.stat_runs
-
-        # keep the generated response or not?
-        # later algos calculation time benefits from
-        # distorts the time statistics between the algos
-        if cls.tor_loaded and not cls.fb_alternat:
-            #cls.tor = cls.tor_imp.copy()
-            pass
-        elif cls.tor_loaded and cls.fb_alternat:
-            #cls.tor.clear()
-            pass
-        elif not cls.tor_loaded:
-            #cls.tor.clear()
-            pass
+        repeats = len(cls.code_pool)
+
+        # the cached responses are kept for the later algos,
+        # only the counters start again
+        cls.cache.reset_stats()
+        cls.timer.clear()
+        cls.tree_hits = cls.tree_misses = 0
 
         if cls.fb_alternat:
             cls.fb_calls = 0
@@ -84,47 +132,222 @@ class Starter(Calculation):
         pb.start()
 
         starttime0 = time.perf_counter()
-        if not cls.thread:
-            for code in cls.code_pool:
-                pb.update()     # progress bar output
-                starttime  = time.perf_counter()
-                stat[0].append(cls.start_mastermind(code))
-                stat[1].append((time.perf_counter() - starttime) * 1000)   # msec
-            pb.close()
 
-        # threading
-        # yet not working efficient
+        # exact, a single walk through the decision tree
+        # the time per game is the average
+        if cls.stat_exact and algo in cls.ALGO_TREE:
+            stat[0] = cls.start_exhaustive(pb)
+            msec = (time.perf_counter() - starttime0) * 1000 / repeats
+            stat[1] = [msec] * repeats
+
+        elif not executor:
+            stat = cls.play_codes(cls.code_pool, pb)
+
+        # process pool
+        # the code_pool is split into small parts for an even load
+        # and a running progress bar, the results come back in order
+        # with a seed, every game has its own fixed random state (play_codes)
         else:
-            def worker1(codelist, codelists):
-                a = 20 // len(codelists)
-                stat = [[],[]]
-                for code in codelist:
-                    starttime  = time.perf_counter()
-                    stat[0].append(cls.start_mastermind(code))
-                    stat[1].append((time.perf_counter() - starttime) * 1000)   # msec
-                print(f'{"*" * a}', end="", flush=True)
-                return stat
-
-            # threeading without positiv effect
-            # multiprocessing also without effect and problems with capseled data managment
-            threads = 4
-            part = repeats // threads + 1
-            codelists = [cls.code_pool[i*part: (i+1)*part] for i in range(threads)]
-            while not codelists[-1]:
-                codelists.pop()
-
-            with fs.ThreadPoolExecutor(max_workers=threads) as executor:
-                futures = [executor.submit(worker1, codelist, codelists) for codelist in codelists]
-                results = [future.result() for future in fs.as_completed(futures)]
-
-            for a, b in results:
-                stat[0].extend(a)
-                stat[1].extend(b)
+            # the opening book once here, handed over to the workers with every job
+            # the new nodes of the workers are merged into this tree
+            tree = {}
+            if algo in cls.ALGO_TREE:
+                tree = cls.get_tree()
+                if not cls.tor_help:
+                    # with TOR help, get_tree has already opened the book
+                    cls.open_book(cls.tree_key(), tree, build=True)
+            book = [(path, rank) for path, rank in tree.items() if len(path) < 2]
 
+            part = max(1, repeats // (cls.workers * 8))
+            starts = range(0, repeats, part)
+            codelists = [cls.code_pool[i: i+part] for i in starts]
+
+            for codelist, (steps, msec, cache_stats, timer_stats, tree_stats, nodes) in zip(
+                    codelists, executor.map(
+                        _run_worker, [algo] * len(codelists), codelists, starts, [book] * len(codelists))):
+                stat[0].extend(steps)
+                stat[1].extend(msec)
+                cls.cache.add_stats(cache_stats)
+                cls.timer.add_stats(timer_stats)
+                cls.tree_hits += tree_stats[0]
+                cls.tree_misses += tree_stats[1]
+                for path, rank in nodes:
+                    tree.setdefault(path, rank)
+                for _ in codelist:
+                    pb.update()
+
+        pb.close()
         stat.append(time.perf_counter() - starttime0)   # type: ignore // sec
 
+        cls.sample_ref = cls.exact_reference(algo)
 
         cls.show_statistics(stat)
 
+        summary = cls.stat_summary(algo, stat)
+        if cls.stat_store:
+            cls.store_stat_record(summary)
+
+        return summary
+
+
+    @classmethod
+    def exact_reference(cls, algo):
+        """ average steps of the exact solver on the same secrets,
+            the reference of a sampled run, if the exact one is feasible
+        """
+        if not cls.sample_budget or algo not in cls.ALGO_TREE or cls.len_variants() > cls.MAX_TOR:
+            return None
+
+        # the counters and timers of the sampled run are kept,
+        # the reference run is not part of its stats
+        budget, cls.sample_budget = cls.sample_budget, 0
+        tree_stats = cls.tree_hits, cls.tree_misses
+        cache_stats = cls.cache.stats()
+        timer_stats = cls.timer.stats()
+        try:
+            if cls.stat_exact:
+                steps = cls.start_exhaustive()
+            else:
+                steps = cls.play_codes(cls.code_pool)[0]
+        finally:
+            cls.sample_budget = budget
+            cls.tree_hits, cls.tree_misses = tree_stats
+            cls.cache.reset_stats()
+            cls.cache.add_stats(cache_stats)
+            cls.timer.clear(keep_setup=False)
+            cls.timer.add_stats(timer_stats)
+
+        return sum(steps) / len(steps)
+
+
+    @classmethod
+    def stat_summary(cls, algo, stat):
+        """ machine-readable result of a statistic run
+            stat: [[steps], [msec], sec]
+            latency: msec per game, mean, median, p90, p99, max
+        """
+        steps, msec, alltime = stat
+        p90, p99 = np.percentile(msec, [90, 99])
+        return {
+            "date": cls.stat_date,
+            "algo": cls.ALGO_SET[algo],
+            "algo_id": algo,
+            "char": cls.char,
+            "columns": cls.columns,
+            "repetition": cls.repetition,
+            "numbers": cls.numbers,
+            "limit": cls.limit,
+            "tor": cls.tor_loaded,
+            "exact": cls.stat_exact,
+            "runs": len(steps),
+            "seed": cls.seed,
+            "workers": cls.workers,
+            "tor_shared": cls.tor_shared is not None,
+            "sample_budget": cls.sample_budget,
+            "ga_population": cls.ga_population,
+            "ga_generations": cls.ga_generations,
+            "average": sum(steps) / len(steps),
+            "median": median(steps),
+            "max": max(steps),
+            "min": min(steps),
+            "histo": dict(sorted(Counter(steps).items())),
+            "avg_msec": sum(msec) / len(msec),
+            "med_msec": median(msec),
+            "p90_msec": float(p90),
+            "p99_msec": float(p99),
+            "max_msec": max(msec),
+            "alltime_sec": alltime,
+            "cache_hits": cls.cache.hits,
+            "cache_misses": cls.cache.misses,
+            "cache_evictions": cls.cache.evictions,
+            "tree_hits": cls.tree_hits,
+            "tree_misses": cls.tree_misses,
+            "exact_average": cls.sample_ref,
+            "phases": {f'{phase} {turn}': {"calls": calls, "sec": sec}
+                       for (phase, turn), (calls, sec) in cls.timer.stats().items()},
+        }
+
+
+    @classmethod
+    def play_codes(cls, codes, pb=None, start=0):
+        """ plays a game for every code of 'codes'
+            with a seed, the random state of a game depends only on
+            the seed, the algo and its index in the code_pool ('start' + i),
+            the same results with any number of workers
+            returns [[steps], [msec]]
+        """
+        stat = [[],[]]
+        for i, code in enumerate(codes, start):
+            if cls.seed is not None:
+                random.seed(f'{cls.seed}-{cls.algo}-{i}')
+            if pb:
+                pb.update()     # progress bar output
+            starttime  = time.perf_counter()
+            stat[0].append(cls.start_mastermind(code))
+            stat[1].append((time.perf_counter() - starttime) * 1000)   # msec
+        return stat
+
+
+    @classmethod
+    def setup_snapshot(cls):
+        """ the current user setup as a picklable dict
+        """
+        return {key: getattr(cls, key) for key in cls.SETUP_KEYS}
+
+
+    @classmethod
+    def restore_setup(cls, setup):
+        """ takes over a setup snapshot, checks it
+            and attaches the TOR file or the shared response matrix of the setup
+            char and columns are taken over as resolved by the main process
+        """
+        for key, value in setup.items():
+            setattr(cls, key, value)
+
+        cls.check_setup(resolved=True)
+        cls.len_variants()
+
+        # without loading message
+        with redirect_stdout(io.StringIO()):
+            cls.load_tor_file()
+
+        # the response matrix of the main process, instead of an own cache
+        if cls.tor_shared and not cls.tor_loaded:
+            cls.attach_tor(cls.tor_shared)
+
+
+# ==========================================================
+# process pool worker, on module level to be picklable
+
+def _init_worker(setup):
+    """ worker start: takes over the setup of the main process
+        and its own random state, not the forked one
+    """
+    random.seed()
+    Starter.restore_setup(setup)
+
+
+def _run_worker(algo, codes, start=0, book=()):
+    """ worker job: plays a part of the code_pool with 'algo',
+        'start': index of its first code in the code_pool,
+        'book': the opening book of the main process, (path, rank) nodes
+        returns [steps], [msec], the cache counters, phase timers,
+        decision tree counters (hits, misses) and the new tree nodes of this job
+    """
+    Starter.algo = algo
+    tree = Starter.get_tree() if algo in Starter.ALGO_TREE else {}
+    for path, rank in book:
+        tree.setdefault(path, rank)
+    known = len(tree)
+    Starter.cache.reset_stats()
+    Starter.timer.clear(keep_setup=False)
+    Starter.tree_hits = Starter.tree_misses = 0
+    steps, msec = Starter.play_codes(codes, start=start)
+    tree_stats = Starter.tree_hits, Starter.tree_misses
+
+    # a tree only grows, the new nodes are the last ones
+    nodes = list(islice(tree.items(), known, None))
+    return steps, msec, Starter.cache.stats(), Starter.timer.stats(), tree_stats, nodes
+
 
 # ==========================================================
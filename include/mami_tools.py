@@ -2,8 +2,10 @@
     ColorList
     ToolBox
     ProgressBar
+    PhaseTimer
 """
 from os import system
+from time import perf_counter
 system("color")
 
 
@@ -129,3 +131,65 @@ class ProgressBar:
 
 
 # ==========================================================
+
+class PhaseTimer:
+    """ time and calls per phase and turn, for the hot paths
+        turn 0: setup phases, e.g. the TOR load
+    """
+    ORDER = ("guess", "feedback", "filter", "tor load", "tor save")
+
+    def __init__(self):
+        self.data = {}      # (phase, turn): [calls, sec]
+
+    def add(self, phase, turn, sec):
+        """ one call of 'phase' in 'turn' with its duration
+        """
+        entry = self.data.get((phase, turn))
+        if entry:
+            entry[0] += 1
+            entry[1] += sec
+        else:
+            self.data[(phase, turn)] = [1, sec]
+
+    def lap(self, phase, turn, start):
+        """ adds the time since 'start', returns the new start
+        """
+        now = perf_counter()
+        self.add(phase, turn, now - start)
+        return now
+
+    def clear(self, keep_setup=True):
+        """ removes the per-turn entries, the setup phases on request
+        """
+        self.data = {key: value for key, value in self.data.items()
+                     if keep_setup and key[1] == 0}
+
+    def stats(self):
+        """ entries as a picklable dict
+        """
+        return {key: tuple(value) for key, value in self.data.items()}
+
+    def add_stats(self, stats):
+        """ adds the entries of another timer, e.g. of a worker process
+        """
+        for (phase, turn), (calls, sec) in stats.items():
+            entry = self.data.setdefault((phase, turn), [0, 0.0])
+            entry[0] += calls
+            entry[1] += sec
+
+    def report(self, games):
+        """ one line per phase and turn: msec per game, share of all, calls
+        """
+        total = sum(sec for _, sec in self.data.values()) or 1
+        order = {phase: i for i, phase in enumerate(self.ORDER)}
+        lines = [f'{"phase":10}: {"msec/game":>10} {"%":>6} {"calls":>10}\n']
+        for (phase, turn), (calls, sec) in sorted(
+                self.data.items(), key=lambda x: (order.get(x[0][0], len(order)), x[0])):
+            name = f'{phase} {turn}' if turn else phase
+            lines.append(
+                f'{name:10}: {sec * 1000 / max(games, 1):>10,.3f} '
+                f'{sec / total * 100:>6.1f} {calls:>10,d}\n')
+        return "".join(lines)
+
+
+# ==========================================================
@@ -1,7 +1,11 @@
 """ <2021, 2025> https://github.com/zorro4u/mastermind
 """
+import sys
+
 from include import ColorList as fg
 from include import Starter
+from include import Batch
+from include import Bench
 
 # ==========================================================
 
@@ -18,6 +22,7 @@ class Mastermind(Starter):
         while key:
             if first:
                 cls.show_setup()
+                cls.prefetch_tor()      # the TOR is loaded during the setup question
             cls.question_change_setup(first)
 
             cls.start_game()
@@ -31,8 +36,15 @@ class Mastermind(Starter):
 # ==========================================================
 
 def main():
-    """ starts mastermind
+    """ starts mastermind,
+        with arguments a statistic run without prompts (--help)
+        or the benchmark suite (--bench --help)
     """
+    if sys.argv[1:2] == ["--bench"]:
+        sys.exit(Bench.run(sys.argv[2:]))
+    if len(sys.argv) > 1:
+        sys.exit(Batch.run())
+
     print("\n", __doc__)
     print(f'{fg.yellow}-- MasterMind --{fg.off}')
     print(f'{"=" * 24}\n')